@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""Microbenchmarks for the CPU-bound parts of recipe_clients.
+
+Run from the repository root with `python -m benchmarks`; see
+benchmarks/README.md.
+"""
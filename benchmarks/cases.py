@@ -0,0 +1,179 @@
+# benchmarks/cases.py
+"""Benchmark cases for the CPU-bound hot paths of recipe_clients.
+
+Each case has a setup function taking a scale name and returning the
+zero-argument callable to time. Setup does everything that should not be
+measured (building payloads and clients); HTTP is replaced by returning a
+prepared payload from the client's `_make_request`, so only parsing,
+validation, conversion and merging are timed.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from recipe_clients.deadline import Deadline
+from recipe_clients.instructions import normalize_instructions, normalize_many
+from recipe_clients.mealdb_adapter import MealDBAdapter
+from recipe_clients.recipe_client_abc import Recipe, RecipeClient
+from recipe_clients.recipe_service import RecipeService
+from recipe_clients.shared_state import InMemorySharedState
+from recipe_clients.spoonacular_adapter import SpoonacularAdapter
+from recipe_clients.wire_format import build_response
+
+from . import payloads
+
+PAYLOAD_SCALES = ("recorded", "small", "medium", "large")
+RESULT_SCALES = ("10", "100", "1000")
+
+
+@dataclass
+class BenchmarkCase:
+    """A named benchmark with the scales it runs at."""
+    name: str
+    description: str
+    setup: Callable[[str], Callable[[], Any]]
+    scales: Tuple[str, ...]
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark(name: str, scales: Tuple[str, ...], description: str = ""):
+    """Register a setup function as a benchmark case."""
+    def register(setup: Callable[[str], Callable[[], Any]]) -> Callable[[str], Callable[[], Any]]:
+        CASES[name] = BenchmarkCase(name, description or (setup.__doc__ or "").strip(), setup, scales)
+        return setup
+    return register
+
+
+def _mealdb_meal(scale: str) -> Dict[str, Any]:
+    return payloads.recorded_mealdb_meal() if scale == "recorded" else payloads.synthetic_mealdb_meal(scale)
+
+
+def _spoonacular_recipe(scale: str) -> Dict[str, Any]:
+    return payloads.recorded_spoonacular_recipe() if scale == "recorded" else payloads.synthetic_spoonacular_recipe(scale)
+
+
+class _StaticClient(RecipeClient):
+    """Recipe client returning a fixed result list, standing in for an adapter."""
+
+    def __init__(self, source_api: str, recipes: List[Recipe]):
+        self.source_api = source_api
+        self.recipes = recipes
+
+    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None) -> List[Recipe]:
+        return list(self.recipes)
+
+    def get_recipe_by_id(self, recipe_id: str, deadline: Optional[Deadline] = None) -> Optional[Recipe]:
+        return self.recipes[0] if self.recipes else None
+
+
+@benchmark("mealdb.lookup_parse", PAYLOAD_SCALES)
+def mealdb_lookup_parse(scale: str) -> Callable[[], Any]:
+    """MealDBClient.get_recipe_details_by_id: response validation and assemble_ingredients."""
+    meal = _mealdb_meal(scale)
+    client = MealDBAdapter().client
+    client._make_request = lambda *args, **kwargs: {"meals": [dict(meal)]}
+    return lambda: client.get_recipe_details_by_id(meal["idMeal"])
+
+
+@benchmark("mealdb.convert_detail", PAYLOAD_SCALES)
+def mealdb_convert_detail(scale: str) -> Callable[[], Any]:
+    """MealDBAdapter._convert_meal_detail_to_recipe: measures and instruction splitting."""
+    meal = _mealdb_meal(scale)
+    adapter = MealDBAdapter()
+    adapter.client._make_request = lambda *args, **kwargs: {"meals": [dict(meal)]}
+    detail = adapter.client.get_recipe_details_by_id(meal["idMeal"])
+    return lambda: adapter._convert_meal_detail_to_recipe(detail)
+
+
+@benchmark("spoonacular.details_parse", PAYLOAD_SCALES)
+def spoonacular_details_parse(scale: str) -> Callable[[], Any]:
+    """SpoonacularClient.get_recipe_details_by_id: instruction splitting and model validation."""
+    recipe = _spoonacular_recipe(scale)
+    client = SpoonacularAdapter(api_key="benchmark").client
+    client._make_request = lambda *args, **kwargs: recipe
+    return lambda: client.get_recipe_details_by_id(str(recipe["id"]))
+
+
+@benchmark("spoonacular.search_parse", RESULT_SCALES)
+def spoonacular_search_parse(scale: str) -> Callable[[], Any]:
+    """SpoonacularClient.search_recipes: complexSearch validation and ingredient matching."""
+    response = payloads.synthetic_search_response(int(scale))
+    client = SpoonacularAdapter(api_key="benchmark").client
+    client._make_request = lambda *args, **kwargs: response
+    return lambda: client.search_recipes("benchmark")
+
+
+@benchmark("spoonacular.convert", PAYLOAD_SCALES)
+def spoonacular_convert(scale: str) -> Callable[[], Any]:
+    """SpoonacularAdapter._convert_spoonacular_to_recipe."""
+    recipe = _spoonacular_recipe(scale)
+    adapter = SpoonacularAdapter(api_key="benchmark")
+    adapter.client._make_request = lambda *args, **kwargs: dict(recipe)
+    sp_recipe = adapter.client.get_recipe_details_by_id(str(recipe["id"]))
+    return lambda: adapter._convert_spoonacular_to_recipe(sp_recipe)
+
+
+@benchmark("service.search_merge", RESULT_SCALES)
+def service_search_merge(scale: str) -> Callable[[], Any]:
+    """RecipeService.search_recipes without a cache: store updates, merge and sort of two providers."""
+    count = int(scale)
+    service = RecipeService(clients=[
+        _StaticClient("spoonacular", payloads.synthetic_recipes(count, "spoonacular", seed=1)),
+        _StaticClient("themealdb", payloads.synthetic_recipes(count, "themealdb", seed=2)),
+    ])
+    service.shared_state = None
+    return lambda: service.search_recipes("benchmark", limit=2 * count)
+
+
+@benchmark("service.cached_search", RESULT_SCALES)
+def service_cached_search(scale: str) -> Callable[[], Any]:
+    """RecipeService.search_recipes served from the shared cache: decoding, merge and sort."""
+    count = int(scale)
+    service = RecipeService(clients=[
+        _StaticClient("spoonacular", payloads.synthetic_recipes(count, "spoonacular", seed=1)),
+        _StaticClient("themealdb", payloads.synthetic_recipes(count, "themealdb", seed=2)),
+    ], shared_state=InMemorySharedState())
+    service.search_recipes("benchmark", limit=2 * count)  # Fill the cache
+    return lambda: service.search_recipes("benchmark", limit=2 * count)
+
+
+@benchmark("wire.build_response", RESULT_SCALES)
+def wire_build_response(scale: str) -> Callable[[], Any]:
+    """wire_format.build_response: content hashes, ETag and compact JSON encoding."""
+    recipes = payloads.synthetic_recipes(int(scale))
+    return lambda: build_response(recipes, "application/json")
+
+
+def _instruction_texts(count: int) -> List[str]:
+    return [payloads.synthetic_mealdb_meal("medium", seed=i)["strInstructions"] for i in range(count)]
+
+
+@benchmark("instructions.per_recipe", RESULT_SCALES)
+def instructions_per_recipe(scale: str) -> Callable[[], Any]:
+    """instructions.normalize_instructions called once per recipe."""
+    texts = _instruction_texts(int(scale))
+    return lambda: [normalize_instructions(text) for text in texts]
+
+
+def _legacy_split(text: str) -> List[str]:
+    # The per-recipe splitting that instructions.py replaced, as each adapter had it inline
+    import re
+    steps = re.split(r'\.(?:\s+|\n+)', text)
+    return [step.strip() + "." for step in steps if step.strip()]
+
+
+@benchmark("instructions.legacy_regex", RESULT_SCALES)
+def instructions_legacy_regex(scale: str) -> Callable[[], Any]:
+    """The removed inline re.split path, over the same texts, for comparison with the two above."""
+    texts = _instruction_texts(int(scale))
+    return lambda: [_legacy_split(text) for text in texts]
+
+
+@benchmark("instructions.batch", RESULT_SCALES)
+def instructions_batch(scale: str) -> Callable[[], Any]:
+    """instructions.normalize_many over the same texts in one call."""
+    texts = _instruction_texts(int(scale))
+    return lambda: normalize_many(texts)
@@ -0,0 +1,182 @@
+# benchmarks/payloads.py
+"""Recorded and synthetic API payloads for the benchmarks.
+
+Recorded payloads are real responses stored under `benchmarks/data`.
+Synthetic payloads have the same shape and are generated deterministically
+from a seed, so every run and every machine times the same input.
+"""
+
+import copy
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+from recipe_clients.recipe_client_abc import Recipe, RecipeIngredient
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Ingredient and instruction counts per payload size
+PAYLOAD_SIZES = {
+    "small": (5, 4),
+    "medium": (12, 12),
+    "large": (20, 40),
+}
+
+_INGREDIENTS = [
+    "chicken breast", "olive oil", "garlic", "onion", "tomatoes", "basil", "parmesan",
+    "butter", "flour", "milk", "eggs", "rice", "soy sauce", "ginger", "carrots",
+    "potatoes", "salt", "black pepper", "cumin", "paprika", "lemon", "spinach",
+    "mushrooms", "cream", "beef stock", "coriander", "chilli", "honey", "lime", "pasta",
+]
+_MEASURES = ["1 cup", "1/2 tsp", "2 tbsp", "200g", "1 1/2 cups", "3 cloves", "pinch", "1 can", "500ml", "2"]
+_UNITS = ["cup", "tsp", "tbsp", "g", "cups", "cloves", "pinch", "can", "ml", ""]
+_VERBS = ["Heat", "Add", "Stir in", "Simmer", "Season", "Whisk", "Fold in", "Bake", "Chop", "Toss"]
+_CUISINES = ["Italian", "Mexican", "Indian", "Chinese", "French", "Thai", "Greek", "Japanese"]
+_DIETS = ["vegetarian", "vegan", "gluten free", "dairy free", "ketogenic", "paleo"]
+
+
+def load_recorded(name: str) -> Dict[str, Any]:
+    """Load a recorded payload from `benchmarks/data` by file name."""
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def recorded_mealdb_meal() -> Dict[str, Any]:
+    """The recorded TheMealDB lookup.php meal (Spicy Arrabiata Penne)."""
+    return load_recorded("mealdb_lookup_52771.json")["meals"][0]
+
+
+def recorded_spoonacular_recipe() -> Dict[str, Any]:
+    """The recorded Spoonacular recipe information payload."""
+    return load_recorded("spoonacular_information_716429.json")
+
+
+def _instructions(rng: random.Random, steps: int) -> str:
+    sentences = [
+        f"{rng.choice(_VERBS)} the {rng.choice(_INGREDIENTS)} with the {rng.choice(_INGREDIENTS)} "
+        f"for {rng.randint(2, 30)} minutes"
+        for _ in range(steps)
+    ]
+    # Mix the separators the upstream text uses: spaces, newlines and CRLF
+    text = ""
+    for i, sentence in enumerate(sentences):
+        text += sentence + "." + ("" if i == len(sentences) - 1 else rng.choice([" ", "\n", "\r\n", "  "]))
+    return text
+
+
+def synthetic_mealdb_meal(size: str = "medium", seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate a TheMealDB lookup.php meal dictionary.
+
+    Args:
+        size: Key of PAYLOAD_SIZES.
+        seed: Seed for the generated content.
+
+    Returns:
+        A meal dictionary with strIngredient1..20 / strMeasure1..20 keys.
+    """
+    ingredients, steps = PAYLOAD_SIZES[size]
+    rng = random.Random(seed)
+    meal: Dict[str, Any] = {
+        "idMeal": str(52000 + seed),
+        "strMeal": f"Synthetic Meal {seed}",
+        "strDrinkAlternate": None,
+        "strCategory": "Miscellaneous",
+        "strArea": rng.choice(_CUISINES),
+        "strInstructions": _instructions(rng, steps),
+        "strMealThumb": f"https://www.themealdb.com/images/media/meals/synthetic{seed}.jpg",
+        "strTags": ",".join(rng.sample(["Pasta", "Curry", "Meat", "Dinner", "Spicy", "Quick"], 2)),
+        "strYoutube": None,
+        "strSource": None,
+        "strImageSource": None,
+        "strCreativeCommonsConfirmed": None,
+        "dateModified": None,
+    }
+    names = rng.sample(_INGREDIENTS, ingredients)
+    for i in range(1, 21):
+        meal[f"strIngredient{i}"] = names[i - 1] if i <= ingredients else ("" if i <= 15 else None)
+        meal[f"strMeasure{i}"] = rng.choice(_MEASURES) if i <= ingredients else ("" if i <= 15 else None)
+    return meal
+
+
+def synthetic_spoonacular_recipe(size: str = "medium", seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate a Spoonacular recipe information payload.
+
+    Args:
+        size: Key of PAYLOAD_SIZES.
+        seed: Seed for the generated content.
+
+    Returns:
+        A payload with extendedIngredients and string instructions.
+    """
+    ingredients, steps = PAYLOAD_SIZES[size]
+    rng = random.Random(seed)
+    recipe = copy.deepcopy(recorded_spoonacular_recipe())
+    recipe.update({
+        "id": 700000 + seed,
+        "title": f"Synthetic Recipe {seed}",
+        "readyInMinutes": rng.randint(10, 120),
+        "servings": rng.randint(1, 8),
+        "cuisines": rng.sample(_CUISINES, 1),
+        "diets": rng.sample(_DIETS, rng.randint(0, 2)),
+        "instructions": _instructions(rng, steps),
+        "extendedIngredients": [
+            {
+                "id": 1000 + i,
+                "name": name,
+                "nameClean": name,
+                "amount": round(rng.uniform(0.25, 4.0), 2),
+                "unit": rng.choice(_UNITS),
+                "original": f"{rng.choice(_MEASURES)} {name}",
+            }
+            for i, name in enumerate(rng.sample(_INGREDIENTS, ingredients))
+        ],
+    })
+    return recipe
+
+
+def synthetic_search_response(count: int, size: str = "small", seed: int = 0) -> Dict[str, Any]:
+    """A complexSearch response with `count` results carrying extendedIngredients."""
+    results = [synthetic_spoonacular_recipe(size, seed + i) for i in range(count)]
+    for result in results:
+        # complexSearch returns analyzedInstructions only, not the instruction text
+        del result["instructions"]
+    return {
+        "results": results,
+        "offset": 0,
+        "number": count,
+        "totalResults": count,
+    }
+
+
+def synthetic_recipes(count: int, provider: str = "spoonacular", seed: int = 0) -> List[Recipe]:
+    """
+    Generate standardized Recipe objects, as the adapters return them.
+
+    Args:
+        count: Number of recipes.
+        provider: source_api and ID prefix of the recipes.
+        seed: Seed for the generated content.
+
+    Returns:
+        Recipes with unsorted names, so merging has real sorting work to do.
+    """
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(count):
+        names = rng.sample(_INGREDIENTS, rng.randint(4, 12))
+        recipes.append(Recipe(
+            id=f"{provider}_{seed * 100000 + i}",
+            source_api=provider,
+            source_id=str(seed * 100000 + i),
+            name=f"{rng.choice(_VERBS)} {names[0]} {rng.randint(0, 10 ** 6)}",
+            ingredients=[RecipeIngredient(name=n, amount=1.0, unit="cup", original_text=f"1 cup {n}") for n in names],
+            instructions=[f"Step {s}." for s in range(rng.randint(3, 10))],
+            total_time_minutes=rng.randint(10, 120),
+            servings=rng.randint(1, 8),
+            cuisine_tags=[rng.choice(_CUISINES)],
+            dietary_tags=rng.sample(_DIETS, rng.randint(0, 2)),
+        ))
+    return recipes
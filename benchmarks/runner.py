@@ -0,0 +1,250 @@
+# benchmarks/runner.py
+"""Runs the benchmark cases and compares the results with a stored baseline.
+
+Results are written as JSON: one entry per (case, scale) with the per-call
+median, minimum, mean and standard deviation in microseconds, plus the
+environment they were measured in. Comparisons use the fastest repeat,
+which is the least affected by other load on the machine; a case is a
+regression when it is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .cases import CASES
+
+SCHEMA_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            # '-dirty' marks results measured with uncommitted changes
+            ["git", "describe", "--always", "--dirty", "--abbrev=7"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and library versions the results were measured with."""
+    import pydantic
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pydantic": pydantic.VERSION,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run_case(name: str, scale: str, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Time one case at one scale.
+
+    The loop count is chosen so one repeat takes at least `min_time`
+    seconds; garbage collection is disabled while timing, as in timeit.
+
+    Args:
+        name: Case name.
+        scale: Scale name, one of the case's scales.
+        repeat: Number of timed repeats.
+        min_time: Minimum seconds per repeat.
+
+    Returns:
+        The result entry for the JSON report.
+    """
+    func = CASES[name].setup(scale)
+    timer = timeit.Timer(func)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 2
+    per_call = [t / loops * 1e6 for t in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "case": name,
+        "scale": scale,
+        "loops": loops,
+        "repeat": repeat,
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+        "stdev_us": round(statistics.stdev(per_call), 3) if repeat > 1 else 0.0,
+    }
+
+
+def run_suite(pattern: Optional[str] = None, repeat: int = 5, min_time: float = 0.2,
+              progress=None) -> Dict[str, Any]:
+    """
+    Run every case (or those whose name contains `pattern`) at all its scales.
+
+    Args:
+        pattern: Substring a case name must contain to be run.
+        repeat: Number of timed repeats per measurement.
+        min_time: Minimum seconds per repeat.
+        progress: Optional callable receiving each result as it is measured.
+
+    Returns:
+        The JSON report.
+    """
+    results = []
+    for case in CASES.values():
+        if pattern and pattern not in case.name:
+            continue
+        for scale in case.scales:
+            result = run_case(case.name, scale, repeat, min_time)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {"schema": SCHEMA_VERSION, "environment": environment(), "results": results}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare a report with a baseline report.
+
+    Args:
+        report: Report produced by `run_suite`.
+        baseline: Earlier report to compare with.
+        threshold: Relative change below which a case counts as unchanged.
+
+    Returns:
+        One entry per (case, scale) in either report, with the ratio of the
+        fastest repeats (current / baseline) and a status of 'regression',
+        'improvement', 'unchanged', 'new' or 'missing'.
+    """
+    before = {(r["case"], r["scale"]): r for r in baseline.get("results", [])}
+    after = {(r["case"], r["scale"]): r for r in report.get("results", [])}
+    rows = []
+    for key in list(after) + [k for k in before if k not in after]:
+        old, new = before.get(key), after.get(key)
+        row = {"case": key[0], "scale": key[1],
+               "baseline_us": old["min_us"] if old else None,
+               "current_us": new["min_us"] if new else None,
+               "ratio": None}
+        if old is None:
+            row["status"] = "new"
+        elif new is None:
+            row["status"] = "missing"
+        else:
+            row["ratio"] = round(new["min_us"] / old["min_us"], 3) if old["min_us"] else None
+            if row["ratio"] is None:
+                row["status"] = "unchanged"
+            elif row["ratio"] > 1 + threshold:
+                row["status"] = "regression"
+            elif row["ratio"] < 1 - threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "unchanged"
+        rows.append(row)
+    return rows
+
+
+def merge_results(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update a baseline report with the results of a (possibly filtered) run.
+
+    Args:
+        report: Report produced by `run_suite`.
+        baseline: Earlier report whose other results are kept.
+
+    Returns:
+        A report with the run's environment and results, followed by the
+        baseline results for (case, scale) pairs the run did not measure.
+    """
+    measured = {(r["case"], r["scale"]) for r in report.get("results", [])}
+    kept = [r for r in baseline.get("results", []) if (r["case"], r["scale"]) not in measured]
+    return dict(report, results=report.get("results", []) + kept)
+
+
+def _format_us(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if value >= 1000:
+        return f"{value / 1000:.2f} ms"
+    return f"{value:.1f} us"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", help="only run cases whose name contains this substring")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per measurement (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat (default 0.2)")
+    parser.add_argument("-o", "--output", help="write the JSON report to this file ('-' for stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline report to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to the baseline file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if any case regressed")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in CASES.values():
+            print(f"{case.name:28} {','.join(case.scales):24} {case.description}")
+        return 0
+
+    def progress(result: Dict[str, Any]) -> None:
+        print(f"{result['case']:28} {result['scale']:>9}  {_format_us(result['median_us']):>11}"
+              f"  (±{_format_us(result['stdev_us'])})", file=sys.stderr)
+
+    report = run_suite(args.filter, args.repeat, args.min_time, progress)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["comparison"] = {
+            "baseline_commit": baseline.get("environment", {}).get("commit"),
+            "threshold": args.threshold,
+            "rows": compare(report, baseline, args.threshold),
+        }
+        if args.filter:
+            report["comparison"]["rows"] = [r for r in report["comparison"]["rows"] if r["status"] != "missing"]
+        print(f"\nCompared with {args.baseline}:", file=sys.stderr)
+        for row in report["comparison"]["rows"]:
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            print(f"{row['case']:28} {row['scale']:>9}  {_format_us(row['baseline_us']):>11} -> "
+                  f"{_format_us(row['current_us']):>11}  {ratio:>6}  {row['status']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.save_baseline:
+        saved = report
+        if args.filter and os.path.exists(args.baseline):
+            # A filtered run only replaces the cases it ran, and only in a
+            # baseline of the same commit, so every result has one provenance
+            with open(args.baseline, encoding="utf-8") as f:
+                previous = json.load(f)
+            previous_commit = previous.get("environment", {}).get("commit")
+            if previous_commit != report["environment"]["commit"]:
+                print(f"\n{args.baseline} was recorded at {previous_commit}, not "
+                      f"{report['environment']['commit']}; run without -k to replace it", file=sys.stderr)
+                return 2
+            saved = merge_results(report, previous)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(json.dumps(saved, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}", file=sys.stderr)
+    if args.output == "-":
+        print(text)
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if baseline is not None and args.fail_on_regression:
+        if any(row["status"] == "regression" for row in report["comparison"]["rows"]):
+            return 1
+    return 0
@@ -0,0 +1,298 @@
+# recipe_clients/columnar_export.py
+"""Bulk export and load of the recipe store as columnar Arrow/Parquet tables.
+
+The store is written as three tables that share the recipe ID as a join key:
+
+- ``recipes``: one row per recipe with the scalar fields and instructions.
+- ``ingredients``: one row per recipe ingredient.
+- ``tags``: one row per cuisine or dietary tag.
+
+Writes are streamed in row groups so exporting a large store never holds
+more than one batch of rows in memory. Tables written in the Arrow IPC
+format are loaded back memory-mapped, without copying the column buffers.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from .recipe_client_abc import Recipe, RecipeIngredient
+from .recipe_store import RecipeStore
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TABLE_NAMES = ("recipes", "ingredients", "tags")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_ROW_GROUP_SIZE = 10_000  # Recipes per row group
+
+
+def _require_pyarrow():
+    """Import pyarrow lazily so the rest of the package does not depend on it."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for columnar export. Install it with `pip install pyarrow`."
+        ) from e
+    return pyarrow
+
+
+def _schemas(pa) -> Dict[str, Any]:
+    """Build the Arrow schemas for the three exported tables."""
+    return {
+        "recipes": pa.schema([
+            ("id", pa.string()),
+            ("source_api", pa.dictionary(pa.int8(), pa.string())),
+            ("source_id", pa.string()),
+            ("name", pa.string()),
+            ("image_url", pa.string()),
+            ("source_url", pa.string()),
+            ("prep_time_minutes", pa.int32()),
+            ("cook_time_minutes", pa.int32()),
+            ("total_time_minutes", pa.int32()),
+            ("servings", pa.int32()),
+            ("instructions", pa.list_(pa.string())),
+        ]),
+        "ingredients": pa.schema([
+            ("recipe_id", pa.string()),
+            ("position", pa.int16()),
+            ("name", pa.string()),
+            ("amount", pa.float64()),
+            ("unit", pa.string()),
+            ("original_text", pa.string()),
+        ]),
+        "tags": pa.schema([
+            ("recipe_id", pa.string()),
+            ("kind", pa.dictionary(pa.int8(), pa.string())),  # 'cuisine' or 'dietary'
+            ("tag", pa.string()),
+        ]),
+    }
+
+
+@dataclass
+class RecipeTables:
+    """The three columnar tables making up an exported recipe store."""
+    recipes: Any  # pyarrow.Table
+    ingredients: Any  # pyarrow.Table
+    tags: Any  # pyarrow.Table
+
+    def to_recipes(self) -> List[Recipe]:
+        """Rebuild standardized Recipe objects from the tables."""
+        return tables_to_recipes(self)
+
+
+class _TableWriter:
+    """Streams row batches of one table to a Parquet or Arrow IPC file."""
+
+    def __init__(self, pa, path: str, schema: Any, file_format: str, compression: Optional[str]):
+        self._pa = pa
+        self._schema = schema
+        if file_format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, schema, compression=compression or "none")
+        else:
+            self._writer = pa.ipc.new_file(path, schema)
+        self._columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        self.rows_written = 0
+
+    def append(self, **row: Any) -> None:
+        for name, column in self._columns.items():
+            column.append(row[name])
+
+    def flush(self) -> None:
+        """Write the buffered rows as one row group (or record batch)."""
+        pending = len(self._columns[self._schema.names[0]])
+        if not pending:
+            return
+        batch = self._pa.RecordBatch.from_pydict(self._columns, schema=self._schema)
+        self._writer.write_batch(batch)
+        self.rows_written += pending
+        for column in self._columns.values():
+            column.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def export_recipes(recipes: Iterable[Recipe], directory: str, file_format: str = "parquet",
+                   row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                   compression: Optional[str] = "zstd") -> Dict[str, str]:
+    """
+    Write recipes as columnar recipes/ingredients/tags tables.
+
+    Args:
+        recipes: The recipes to export, e.g. a RecipeStore.
+        directory: Output directory; created if missing.
+        file_format: 'parquet' for analytics, or 'arrow' for zero-copy reloads.
+        row_group_size: Number of recipes buffered before a row group is written.
+        compression: Parquet compression codec (ignored for 'arrow').
+
+    Returns:
+        Mapping of table name to the path of the written file.
+
+    Raises:
+        ValueError: If the file format or row group size is invalid.
+        ImportError: If pyarrow is not installed.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported file format '{file_format}'. Use one of: {', '.join(FORMATS)}")
+    if row_group_size < 1:
+        raise ValueError("row_group_size must be at least 1")
+
+    pa = _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, name + FORMATS[file_format]) for name in TABLE_NAMES}
+    schemas = _schemas(pa)
+    writers = {
+        name: _TableWriter(pa, paths[name], schemas[name], file_format, compression)
+        for name in TABLE_NAMES
+    }
+
+    try:
+        buffered = 0
+        for recipe in recipes:
+            writers["recipes"].append(
+                id=recipe.id,
+                source_api=recipe.source_api,
+                source_id=recipe.source_id,
+                name=recipe.name,
+                image_url=recipe.image_url,
+                source_url=recipe.source_url,
+                prep_time_minutes=recipe.prep_time_minutes,
+                cook_time_minutes=recipe.cook_time_minutes,
+                total_time_minutes=recipe.total_time_minutes,
+                servings=recipe.servings,
+                instructions=recipe.instructions,
+            )
+            for position, ing in enumerate(recipe.ingredients):
+                writers["ingredients"].append(
+                    recipe_id=recipe.id,
+                    position=position,
+                    name=ing.name,
+                    amount=ing.amount,
+                    unit=ing.unit,
+                    original_text=ing.original_text,
+                )
+            for kind, tags in (("cuisine", recipe.cuisine_tags), ("dietary", recipe.dietary_tags)):
+                for tag in tags:
+                    writers["tags"].append(recipe_id=recipe.id, kind=kind, tag=tag)
+
+            buffered += 1
+            if buffered >= row_group_size:
+                for writer in writers.values():
+                    writer.flush()
+                buffered = 0
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    logger.info(
+        f"Exported {writers['recipes'].rows_written} recipe(s), "
+        f"{writers['ingredients'].rows_written} ingredient row(s) and "
+        f"{writers['tags'].rows_written} tag row(s) to {directory} as {file_format}"
+    )
+    return paths
+
+
+def load_recipe_tables(directory: str, file_format: Optional[str] = None) -> RecipeTables:
+    """
+    Load exported tables back into Arrow tables.
+
+    Arrow IPC files are memory-mapped and read without copying; Parquet files
+    are memory-mapped and decoded.
+
+    Args:
+        directory: Directory previously written by `export_recipes`.
+        file_format: 'parquet' or 'arrow'. Detected from the files if omitted.
+
+    Returns:
+        RecipeTables holding the recipes, ingredients and tags tables.
+
+    Raises:
+        FileNotFoundError: If no exported tables are found in the directory.
+        ImportError: If pyarrow is not installed.
+    """
+    pa = _require_pyarrow()
+    if file_format is None:
+        for candidate, extension in FORMATS.items():
+            if os.path.exists(os.path.join(directory, "recipes" + extension)):
+                file_format = candidate
+                break
+        else:
+            raise FileNotFoundError(f"No exported recipe tables found in {directory}")
+
+    tables = {}
+    for name in TABLE_NAMES:
+        path = os.path.join(directory, name + FORMATS[file_format])
+        if file_format == "arrow":
+            # The table's buffers point into the mapping, so keep no explicit close here
+            tables[name] = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        else:
+            tables[name] = pa.parquet.read_table(path, memory_map=True)
+
+    logger.info(f"Loaded {tables['recipes'].num_rows} recipe(s) from {directory}")
+    return RecipeTables(**tables)
+
+
+def tables_to_recipes(tables: RecipeTables) -> List[Recipe]:
+    """
+    Rebuild standardized Recipe objects from exported tables.
+
+    Args:
+        tables: Tables returned by `load_recipe_tables`.
+
+    Returns:
+        Recipes in their exported order.
+    """
+    recipes: Dict[str, Recipe] = {}
+    columns = tables.recipes.to_pydict()
+    for i, recipe_id in enumerate(columns["id"]):
+        recipes[recipe_id] = Recipe(
+            id=recipe_id,
+            source_api=columns["source_api"][i],
+            source_id=columns["source_id"][i],
+            name=columns["name"][i],
+            instructions=columns["instructions"][i] or [],
+            image_url=columns["image_url"][i],
+            source_url=columns["source_url"][i],
+            prep_time_minutes=columns["prep_time_minutes"][i],
+            cook_time_minutes=columns["cook_time_minutes"][i],
+            total_time_minutes=columns["total_time_minutes"][i],
+            servings=columns["servings"][i],
+        )
+
+    # Ingredient rows were written in recipe order and by position
+    ing = tables.ingredients.to_pydict()
+    for recipe_id, name, amount, unit, original_text in zip(
+            ing["recipe_id"], ing["name"], ing["amount"], ing["unit"], ing["original_text"]):
+        recipe = recipes.get(recipe_id)
+        if recipe is not None:
+            recipe.ingredients.append(
+                RecipeIngredient(name=name, amount=amount, unit=unit, original_text=original_text or "")
+            )
+
+    tags = tables.tags.to_pydict()
+    for recipe_id, kind, tag in zip(tags["recipe_id"], tags["kind"], tags["tag"]):
+        recipe = recipes.get(recipe_id)
+        if recipe is not None:
+            (recipe.cuisine_tags if kind == "cuisine" else recipe.dietary_tags).append(tag)
+
+    return list(recipes.values())
+
+
+def load_recipe_store(directory: str, file_format: Optional[str] = None) -> RecipeStore:
+    """
+    Load an exported directory straight into a RecipeStore.
+
+    Args:
+        directory: Directory previously written by `export_recipes`.
+        file_format: 'parquet' or 'arrow'. Detected from the files if omitted.
+
+    Returns:
+        A RecipeStore containing the exported recipes.
+    """
+    return RecipeStore(tables_to_recipes(load_recipe_tables(directory, file_format)))
@@ -0,0 +1,335 @@
+# recipe_clients/concurrency.py
+"""Adaptive per-provider concurrency limits for upstream HTTP calls.
+
+Each provider has an `AdaptiveLimiter` that every `_make_request` goes
+through. The limit on requests in flight follows AIMD (additive increase,
+multiplicative decrease), as in TCP congestion control:
+
+- when a request finishes in about its endpoint's baseline latency while
+  the limit was fully used, the limit grows by 1/limit, i.e. by about one
+  per round of requests;
+- when a request times out, fails to connect, gets a 429 or 5xx, or an
+  endpoint's smoothed latency rises past `latency_tolerance` times its
+  baseline, the limit is multiplied by `backoff`, at most once per round.
+
+Latency is tracked per endpoint, since a search and a lookup on the same
+provider take very different times. An endpoint's baseline drops to any
+faster latency at once but rises only with time constant
+`baseline_window`, however many requests are made, so it follows a
+lasting slowdown of the provider without drifting up under load.
+
+Requests over the limit wait in a priority queue. Interactive lookups
+(the default) go ahead of background work such as prefetching, which runs
+inside `request_priority(PRIORITY_BACKGROUND)`. `limiter_stats()` reports
+each provider's limit, requests in flight and queue depth.
+"""
+
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import requests
+
+from .deadline import Deadline, DeadlineExceeded
+from .tracing import span
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("recipe_priority",
+                                                                        default=PRIORITY_INTERACTIVE)
+
+
+def current_priority() -> int:
+    """Priority of upstream calls made in the current context (lower goes first)."""
+    return _current_priority.get()
+
+
+class _PriorityScope:
+    """Context manager returned by `request_priority`."""
+
+    __slots__ = ("priority", "_token")
+
+    def __init__(self, priority: int):
+        self.priority = priority
+
+    def __enter__(self) -> int:
+        self._token = _current_priority.set(self.priority)
+        return self.priority
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_priority.reset(self._token)
+        return False
+
+
+def request_priority(priority: int) -> _PriorityScope:
+    """
+    Run upstream calls at a priority. Use as `with request_priority(PRIORITY_BACKGROUND): ...`.
+
+    Like the active trace, the priority lives in a context variable, so it
+    follows work into threads started with `contextvars.copy_context()`.
+
+    Args:
+        priority: Queue priority; lower goes first.
+    """
+    return _PriorityScope(priority)
+
+
+@dataclass
+class LimiterStats:
+    """Snapshot of an AdaptiveLimiter."""
+    name: str
+    limit: int  # Requests allowed in flight
+    in_flight: int
+    queued: int  # Requests waiting for a slot
+    queued_by_priority: Dict[int, int] = field(default_factory=dict)
+    baseline_ms: Dict[str, float] = field(default_factory=dict)  # Healthy latency per endpoint
+    latency_ms: Dict[str, float] = field(default_factory=dict)  # Smoothed recent latency per endpoint
+    increases: int = 0
+    decreases: int = 0
+    rejected: int = 0  # Requests that gave up waiting (deadline passed)
+
+    @property
+    def saturated(self) -> bool:
+        """True when requests are waiting for a slot."""
+        return self.queued > 0
+
+
+class _EndpointLatency:
+    """Baseline and smoothed latency of one endpoint."""
+
+    __slots__ = ("baseline", "latency", "updated_at")
+
+    def __init__(self):
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.updated_at = 0.0  # When the baseline last saw a sample
+
+
+class _Permit:
+    """A granted slot; releasing it reports the request's outcome to the limiter."""
+
+    __slots__ = ("limiter", "endpoint", "epoch", "saturated", "start", "_overloaded")
+
+    def __init__(self, limiter: "AdaptiveLimiter", endpoint: str, epoch: int, saturated: bool):
+        self.limiter = limiter
+        self.endpoint = endpoint
+        self.epoch = epoch
+        self.saturated = saturated
+        self.start = time.monotonic()
+        self._overloaded = False
+
+    def overloaded(self) -> None:
+        """Report that upstream signalled overload (e.g. HTTP 429 or 503)."""
+        self._overloaded = True
+
+    def __enter__(self) -> "_Permit":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None and issubclass(exc_type, DeadlineExceeded):
+            self.limiter._release(self, None)  # Never sent; says nothing about the provider
+            return False
+        if exc_type is not None and issubclass(exc_type, (requests.exceptions.Timeout,
+                                                          requests.exceptions.ConnectionError)):
+            self._overloaded = True
+        self.limiter._release(self, time.monotonic() - self.start)
+        return False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a priority queue for one upstream provider."""
+
+    def __init__(self, name: str, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, smoothing: float = 0.2,
+                 baseline_window: float = 300.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Provider name, used in stats and logs.
+            initial_limit: Requests allowed in flight at first.
+            min_limit: The limit never drops below this.
+            max_limit: The limit never grows above this.
+            backoff: Factor the limit is multiplied by on overload.
+            latency_tolerance: Smoothed latency above this multiple of the
+                               baseline counts as overload.
+            smoothing: Weight of the newest sample in the smoothed latency.
+            baseline_window: Time constant in seconds with which a baseline
+                             rises toward slower latencies.
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._queue: List[list] = []  # Heap of [priority, sequence] waiter entries
+        self._sequence = itertools.count()
+        self._epoch = 0  # Bumped on every decrease; older permits cannot decrease again
+        self._endpoints: Dict[str, _EndpointLatency] = {}
+        self._increases = 0
+        self._decreases = 0
+        self._rejected = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    def request(self, deadline: Optional[Deadline] = None, priority: Optional[int] = None,
+                endpoint: str = "") -> _Permit:
+        """
+        Wait for a slot. Use as `with limiter.request(deadline, endpoint=...) as permit: ...`.
+
+        Args:
+            deadline: Optional deadline; waiting stops when it passes.
+            priority: Queue priority (lower goes first); defaults to
+                      `current_priority()`.
+            endpoint: Endpoint the request goes to, e.g. 'lookup.php'. Its
+                      latency is compared with that endpoint's baseline only.
+
+        Returns:
+            The permit, released when its `with` block ends.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before a slot was free.
+        """
+        priority = current_priority() if priority is None else priority
+        with self._cond:
+            if not self._queue and self._in_flight < int(self._limit):
+                return self._grant(endpoint)
+        with span("queue", provider=self.name, priority=priority) as s:
+            permit = self._wait(priority, deadline, endpoint)
+            s.set_attribute("limit", self.limit)
+        if permit is None:
+            raise DeadlineExceeded(f"Deadline passed while queued for {self.name}")
+        return permit
+
+    def _grant(self, endpoint: str) -> _Permit:
+        self._in_flight += 1
+        return _Permit(self, endpoint, self._epoch, self._in_flight >= int(self._limit))
+
+    def _wait(self, priority: int, deadline: Optional[Deadline], endpoint: str) -> Optional[_Permit]:
+        entry = [priority, next(self._sequence)]
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            while True:
+                if self._queue[0] is entry and self._in_flight < int(self._limit):
+                    heapq.heappop(self._queue)
+                    self._cond.notify_all()  # The next waiter may fit as well
+                    return self._grant(endpoint)
+                timeout = deadline.remaining() if deadline is not None else None
+                if timeout is not None and timeout <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._rejected += 1
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait(timeout)
+
+    def _release(self, permit: _Permit, latency: Optional[float]) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if latency is None:
+                self._cond.notify_all()
+                return
+            current = permit.epoch == self._epoch
+            stats = self._endpoints.get(permit.endpoint)
+            if stats is None:
+                stats = self._endpoints[permit.endpoint] = _EndpointLatency()
+            if not permit._overloaded:
+                now = time.monotonic()
+                if stats.baseline is None or latency <= stats.baseline:
+                    stats.baseline = latency
+                else:
+                    # Rise toward slower latencies at a rate set by elapsed time, not
+                    # by the number of requests, so load cannot drag the baseline up
+                    elapsed = now - stats.updated_at
+                    stats.baseline += (latency - stats.baseline) * (1 - math.exp(-elapsed / self.baseline_window))
+                stats.updated_at = now
+                # Only requests started at the current limit say how it performs
+                if current:
+                    stats.latency = latency if stats.latency is None else (
+                        self.smoothing * latency + (1 - self.smoothing) * stats.latency)
+            overloaded = permit._overloaded or (
+                current and stats.latency is not None and stats.latency > stats.baseline * self.latency_tolerance)
+            if overloaded:
+                if current and self._limit > self.min_limit:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._epoch += 1
+                    for endpoint_stats in self._endpoints.values():
+                        endpoint_stats.latency = None
+                    self._decreases += 1
+                    logger.info(f"{self.name}: concurrency limit cut to {self.limit} "
+                                f"({'overload' if permit._overloaded else 'latency spike'})")
+            elif permit.saturated and self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+                self._increases += 1
+            self._cond.notify_all()
+
+    def stats(self) -> LimiterStats:
+        """Snapshot of the limit, load and latency."""
+        with self._cond:
+            by_priority: Dict[int, int] = {}
+            for priority, _ in self._queue:
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+            return LimiterStats(
+                name=self.name,
+                limit=self.limit,
+                in_flight=self._in_flight,
+                queued=len(self._queue),
+                queued_by_priority=by_priority,
+                baseline_ms={endpoint: round(e.baseline * 1000, 3)
+                             for endpoint, e in self._endpoints.items() if e.baseline is not None},
+                latency_ms={endpoint: round(e.latency * 1000, 3)
+                            for endpoint, e in self._endpoints.items() if e.latency is not None},
+                increases=self._increases,
+                decreases=self._decreases,
+                rejected=self._rejected,
+            )
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(provider: str, **kwargs) -> AdaptiveLimiter:
+    """
+    The process-wide limiter of a provider, created on first use.
+
+    All clients of a provider share it, since they share the upstream.
+
+    Args:
+        provider: Provider name, e.g. 'themealdb'.
+        **kwargs: AdaptiveLimiter arguments, used only when it is created.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = AdaptiveLimiter(provider, **kwargs)
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Dict]:
+    """Stats of every provider's limiter as plain dictionaries, keyed by provider."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    stats = {}
+    for limiter in limiters:
+        snapshot = limiter.stats()
+        stats[limiter.name] = dict(asdict(snapshot), saturated=snapshot.saturated)
+    return stats
@@ -0,0 +1,90 @@
+# recipe_clients/deadline.py
+"""Deadlines that flow from RecipeService down to individual HTTP calls."""
+
+import threading
+import time
+from typing import List, Optional, Union
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is attempted after its deadline has passed."""
+    pass
+
+
+class Deadline:
+    """
+    A point in time by which a request must finish.
+
+    Pass the same Deadline to RecipeService and it is handed down through the
+    adapters to every HTTP call, which gets only the time that remains. Work
+    skipped because the deadline passed is recorded with `mark_skipped`, so
+    the caller can tell a partial result from a complete one.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Start a deadline that expires `seconds` from now.
+
+        Args:
+            seconds: The time budget in seconds.
+        """
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def coerce(cls, value: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """Accept a Deadline, a budget in seconds, or None."""
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(float(value))
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline has passed."""
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout to use for the next blocking call.
+
+        Args:
+            cap: The call's own timeout; the result never exceeds it.
+
+        Returns:
+            The remaining time, capped at `cap`.
+
+        Raises:
+            DeadlineExceeded: If the deadline has already passed.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.budget:.3f}s exceeded")
+        return min(remaining, cap) if cap is not None else remaining
+
+    def expire(self) -> None:
+        """Make the deadline pass now, e.g. to cancel work that is still running."""
+        self.expires_at = time.monotonic()
+
+    def mark_skipped(self, what: str) -> None:
+        """
+        Record work that was skipped because the deadline passed.
+
+        Args:
+            what: Short description, e.g. 'MealDB lookup 52772'.
+        """
+        with self._lock:
+            self.skipped.append(what)
+
+    @property
+    def partial(self) -> bool:
+        """True if any work was skipped, i.e. results are incomplete."""
+        return bool(self.skipped)
+
+    def __repr__(self) -> str:
+        return f"Deadline(budget={self.budget}, remaining={self.remaining():.3f}, skipped={len(self.skipped)})"
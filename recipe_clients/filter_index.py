@@ -0,0 +1,239 @@
+# recipe_clients/filter_index.py
+"""Local attribute index for filtering cached recipes without upstream queries.
+
+Each distinct dietary and cuisine tag has a bitset (a Python int with bit
+`slot` set for every recipe carrying the tag), so AND/OR combinations of
+tags are single bitwise operations. Total time and servings are kept as
+sorted arrays; range conditions are resolved with binary search and turned
+into a bitset with NumPy, then combined with the tag bitsets.
+"""
+
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .recipe_client_abc import Recipe
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_TAG_SEPARATOR_RE = re.compile(r"[\s_]+")
+
+# Spoonacular complexSearch filter keys understood by `query_filters`
+SUPPORTED_FILTERS = ("diet", "cuisine", "excludeCuisine", "maxReadyTime", "minServings", "maxServings")
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a tag so 'Gluten Free', 'gluten_free' and 'gluten-free' match."""
+    return _TAG_SEPARATOR_RE.sub("-", tag.strip().lower())
+
+
+def _as_list(value: Union[str, Sequence[str], None], separator: str = ",") -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part for part in (p.strip() for p in value.split(separator)) if part]
+    return list(value)
+
+
+class _SortedAttribute:
+    """Sorted (value, slot) arrays for one numeric recipe attribute."""
+
+    def __init__(self):
+        self._pending: Dict[int, float] = {}
+        self._values: List[float] = []
+        self._slots = np.empty(0, dtype=np.int64)
+
+    def add(self, slot: int, value: Optional[float]) -> None:
+        if value is not None:
+            self._pending[slot] = value
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        values = np.concatenate([np.asarray(self._values, dtype=np.float64),
+                                 np.fromiter(self._pending.values(), dtype=np.float64)])
+        slots = np.concatenate([self._slots, np.fromiter(self._pending.keys(), dtype=np.int64)])
+        order = np.argsort(values, kind="stable")
+        self._values = values[order].tolist()
+        self._slots = slots[order]
+        self._pending.clear()
+
+    def range_bits(self, size: int, low: Optional[float], high: Optional[float]) -> int:
+        """Bitset of slots whose value lies in [low, high]; unknown values never match."""
+        self._merge()
+        lo = bisect_left(self._values, low) if low is not None else 0
+        hi = bisect_right(self._values, high) if high is not None else len(self._values)
+        if lo >= hi:
+            return 0
+        mask = np.zeros(size, dtype=bool)
+        mask[self._slots[lo:hi]] = True
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+class RecipeFilterIndex:
+    """
+    Bitset and sorted-array index over recipe attributes.
+
+    Recipes get a slot number in insertion order. Adding a recipe whose ID is
+    already indexed is a no-op.
+    """
+
+    def __init__(self, recipes: Optional[Iterable[Recipe]] = None):
+        """
+        Initialize the index, optionally with recipes.
+
+        Args:
+            recipes: Recipes to index.
+        """
+        self._recipes: List[Recipe] = []
+        self._slots: Dict[str, int] = {}
+        self._dietary: Dict[str, int] = {}
+        self._cuisine: Dict[str, int] = {}
+        self._time = _SortedAttribute()
+        self._servings = _SortedAttribute()
+        self._lock = threading.Lock()
+        if recipes:
+            self.add_many(recipes)
+
+    def add(self, recipe: Recipe) -> None:
+        """
+        Index a recipe.
+
+        Args:
+            recipe: The recipe to index.
+        """
+        with self._lock:
+            if recipe.id in self._slots:
+                return
+            slot = len(self._recipes)
+            self._slots[recipe.id] = slot
+            self._recipes.append(recipe)
+            bit = 1 << slot
+            for tag in {normalize_tag(t) for t in recipe.dietary_tags}:
+                self._dietary[tag] = self._dietary.get(tag, 0) | bit
+            for tag in {normalize_tag(t) for t in recipe.cuisine_tags}:
+                self._cuisine[tag] = self._cuisine.get(tag, 0) | bit
+            self._time.add(slot, recipe.total_time_minutes)
+            self._servings.add(slot, recipe.servings)
+
+    def add_many(self, recipes: Iterable[Recipe]) -> None:
+        """Index several recipes."""
+        for recipe in recipes:
+            self.add(recipe)
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def query(self, diet: Union[str, Sequence[str], None] = None,
+              any_diet: Union[str, Sequence[str], None] = None,
+              cuisine: Union[str, Sequence[str], None] = None,
+              exclude_cuisine: Union[str, Sequence[str], None] = None,
+              max_time: Optional[int] = None,
+              min_servings: Optional[int] = None,
+              max_servings: Optional[int] = None) -> List[Recipe]:
+        """
+        Find indexed recipes matching all the given conditions.
+
+        Args:
+            diet: Dietary tags that must all be present.
+            any_diet: Dietary tags of which at least one must be present.
+            cuisine: Cuisine tags of which at least one must be present.
+            exclude_cuisine: Cuisine tags that must not be present.
+            max_time: Maximum total time in minutes; recipes without a known
+                      time are excluded when set.
+            min_servings: Minimum number of servings.
+            max_servings: Maximum number of servings.
+
+        Returns:
+            Matching recipes in insertion order.
+        """
+        with self._lock:
+            size = len(self._recipes)
+            bits = (1 << size) - 1
+
+            for tag in _as_list(diet):
+                bits &= self._dietary.get(normalize_tag(tag), 0)
+            if any_diet is not None:
+                bits &= self._union(self._dietary, _as_list(any_diet))
+            if cuisine is not None:
+                bits &= self._union(self._cuisine, _as_list(cuisine))
+            if exclude_cuisine is not None:
+                bits &= ~self._union(self._cuisine, _as_list(exclude_cuisine))
+            if bits and max_time is not None:
+                bits &= self._time.range_bits(size, None, max_time)
+            if bits and (min_servings is not None or max_servings is not None):
+                bits &= self._servings.range_bits(size, min_servings, max_servings)
+
+            return [self._recipes[slot] for slot in self._bit_positions(bits, size)]
+
+    def query_filters(self, filters: Optional[Dict[str, Any]]) -> List[Recipe]:
+        """
+        Apply Spoonacular-style complexSearch filters locally.
+
+        `diet` uses Spoonacular's syntax: commas mean AND, pipes mean OR.
+        `cuisine` and `excludeCuisine` are comma-separated lists.
+        Other keys are ignored.
+
+        Args:
+            filters: Filter dictionary as passed to RecipeService.search_recipes.
+
+        Returns:
+            Matching recipes in insertion order.
+        """
+        filters = filters or {}
+        unsupported = set(filters) - set(SUPPORTED_FILTERS)
+        if unsupported:
+            logger.debug(f"Ignoring filters not supported locally: {sorted(unsupported)}")
+
+        diet = filters.get("diet")
+        all_diets, any_diets = [], None
+        if isinstance(diet, str) and "|" in diet:
+            any_diets = _as_list(diet, "|")
+        else:
+            all_diets = _as_list(diet)
+
+        return self.query(
+            diet=all_diets,
+            any_diet=any_diets,
+            cuisine=filters.get("cuisine"),
+            exclude_cuisine=filters.get("excludeCuisine"),
+            max_time=filters.get("maxReadyTime"),
+            min_servings=filters.get("minServings"),
+            max_servings=filters.get("maxServings"),
+        )
+
+    @staticmethod
+    def _union(bitsets: Dict[str, int], tags: List[str]) -> int:
+        bits = 0
+        for tag in tags:
+            bits |= bitsets.get(normalize_tag(tag), 0)
+        return bits
+
+    @staticmethod
+    def _bit_positions(bits: int, size: int) -> List[int]:
+        if not bits:
+            return []
+        raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:size]).tolist()
+
+
+def filter_recipes(recipes: Iterable[Recipe], filters: Optional[Dict[str, Any]]) -> List[Recipe]:
+    """
+    Apply Spoonacular-style filters to a list of recipes.
+
+    Args:
+        recipes: The recipes to filter.
+        filters: Filter dictionary; see `RecipeFilterIndex.query_filters`.
+
+    Returns:
+        The matching recipes, in their original order.
+    """
+    recipes = list(recipes)
+    if not filters or not set(filters) & set(SUPPORTED_FILTERS):
+        return recipes
+    return RecipeFilterIndex(recipes).query_filters(filters)
@@ -0,0 +1,366 @@
+# recipe_clients/image_proxy.py
+"""Serves recipe card images at card size from a local disk cache.
+
+Provider image URLs point at full-size pictures on third-party CDNs. Both
+providers publish smaller variants of the same image, so `select_variant`
+rewrites a URL to the smallest one that covers the card:
+
+    Spoonacular  .../recipes/716429-556x370.jpg -> .../recipes/716429-312x231.jpg
+    TheMealDB    .../meals/ustsqw1468250014.jpg -> .../meals/ustsqw1468250014.jpg/medium
+
+`ImageProxy.proxy_url` turns a recipe's image URL into a URL on our own
+server; the handler for it calls `ImageProxy.serve`, which answers from an
+`ImageCache` on disk (LRU-evicted, content-addressed, so identical images
+are stored once) and fetches upstream only on a miss. Responses carry the
+content hash as ETag and a year-long immutable Cache-Control, since a
+variant URL always names the same picture.
+
+Only hosts in `allowed_hosts` are fetched, redirects included, so the proxy
+cannot be used to reach arbitrary URLs; pass the address of a local
+stand-in server there to exercise it without network access.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+import requests
+
+from .deadline import Deadline, DeadlineExceeded
+from .tracing import SPAN_KIND_CLIENT, span
+from .wire_format import etag_matches
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CARD_WIDTH = 312  # Size of a recipe card image in CSS pixels
+CARD_HEIGHT = 192
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_ALLOWED_HOSTS = ("img.spoonacular.com", "spoonacular.com", "www.themealdb.com", "themealdb.com")
+
+# Spoonacular recipe image sizes, smallest first
+SPOONACULAR_SIZES = ((90, 90), (240, 150), (312, 150), (312, 231), (480, 360), (556, 370), (636, 393))
+# TheMealDB square thumbnail variants as (side, URL suffix); the original is 700px
+MEALDB_VARIANTS = ((250, "/preview"), (500, "/medium"))
+
+_SPOONACULAR_IMAGE_RE = re.compile(r"^(?P<base>.*/(?:recipes|recipeImages)/\d+)-\d+x\d+\.(?P<ext>jpe?g|png)$",
+                                   re.IGNORECASE)
+_MEALDB_IMAGE_RE = re.compile(r"^(?P<base>.*/images/media/meals/[^/]+\.(?:jpe?g|png))(?:/[a-z]+)?$",
+                              re.IGNORECASE)
+
+
+def select_variant(image_url: Optional[str], width: int = CARD_WIDTH,
+                   height: int = CARD_HEIGHT) -> Optional[str]:
+    """
+    Rewrite an image URL to the smallest provider variant covering `width` x `height`.
+
+    Args:
+        image_url: A Spoonacular or TheMealDB image URL.
+        width: Display width in pixels.
+        height: Display height in pixels.
+
+    Returns:
+        The variant URL; the URL unchanged if it is not a recognized
+        provider image or no variant is large enough.
+    """
+    if not image_url:
+        return image_url
+    match = _SPOONACULAR_IMAGE_RE.match(image_url)
+    if match:
+        size = next((s for s in SPOONACULAR_SIZES if s[0] >= width and s[1] >= height), SPOONACULAR_SIZES[-1])
+        return f"{match.group('base')}-{size[0]}x{size[1]}.{match.group('ext')}"
+    match = _MEALDB_IMAGE_RE.match(image_url)
+    if match:
+        suffix = next((s for side, s in MEALDB_VARIANTS if side >= max(width, height)), "")
+        return match.group("base") + suffix
+    return image_url
+
+
+@dataclass
+class ImageResponse:
+    """An image (or error) ready to be sent over HTTP."""
+    status: int
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ImageCache:
+    """
+    Size-bounded disk cache of image bytes keyed by URL.
+
+    Bytes are stored once per content hash; an index file maps URLs to
+    hashes and content types in least-recently-used order. It is rewritten
+    every `SAVE_INTERVAL` changes and by `flush()`, so entries added since
+    the last write, and the order of reads, are lost on a crash; their blobs
+    are simply stored again.
+    """
+
+    INDEX_FILE = "index.json"
+    SAVE_INTERVAL = 50  # Index changes between writes of the index file
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Open (or create) a cache directory.
+
+        Args:
+            directory: Directory holding the images and the index.
+            max_bytes: Total size of stored images above which the least
+                       recently used are evicted.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # url -> (content hash, content type)
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._blob_sizes: Dict[str, int] = {}
+        self._blob_refs: Dict[str, int] = {}  # Content hash -> URLs pointing at it
+        self._size_bytes = 0
+        self._unsaved = 0  # Index changes since the index file was written
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, content_hash)
+
+    def _load_index(self) -> None:
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for url, content_hash, content_type in entries:
+            if content_hash not in self._blob_sizes:
+                try:
+                    size = os.path.getsize(self._blob_path(content_hash))
+                except OSError:
+                    continue  # Blob removed behind our back
+                self._blob_sizes[content_hash] = size
+                self._size_bytes += size
+            self._entries[url] = (content_hash, content_type)
+            self._blob_refs[content_hash] = self._blob_refs.get(content_hash, 0) + 1
+
+    def _save_index(self) -> None:
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump([[url, h, t] for url, (h, t) in self._entries.items()], f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        self._unsaved = 0
+
+    def flush(self) -> None:
+        """Write the index file if it has unsaved changes."""
+        with self._lock:
+            if self._unsaved:
+                self._save_index()
+
+    def get(self, url: str) -> Optional[Tuple[bytes, str, str]]:
+        """
+        Look up an image.
+
+        Returns:
+            (bytes, content type, content hash), or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+        try:
+            with open(self._blob_path(entry[0]), "rb") as f:
+                return f.read(), entry[1], entry[0]
+        except OSError:
+            with self._lock:
+                if self._entries.get(url) == entry:
+                    del self._entries[url]
+                    self._release_blob(entry[0])
+                    self._unsaved += 1
+            return None
+
+    def put(self, url: str, data: bytes, content_type: str) -> str:
+        """
+        Store an image and evict least recently used ones over `max_bytes`.
+
+        Returns:
+            The content hash of `data`.
+        """
+        content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            if content_hash not in self._blob_sizes:
+                path = self._blob_path(content_hash)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+                self._blob_sizes[content_hash] = len(data)
+                self._size_bytes += len(data)
+            previous = self._entries.get(url)
+            self._entries[url] = (content_hash, content_type)
+            self._entries.move_to_end(url)
+            self._blob_refs[content_hash] = self._blob_refs.get(content_hash, 0) + 1
+            if previous is not None:
+                self._release_blob(previous[0])
+            self._evict()
+            self._unsaved += 1
+            if self._unsaved >= self.SAVE_INTERVAL:
+                self._save_index()
+        return content_hash
+
+    def _evict(self) -> None:
+        while self._entries and self._size_bytes > self.max_bytes:
+            _, (content_hash, _) = self._entries.popitem(last=False)
+            self._release_blob(content_hash)
+
+    def _release_blob(self, content_hash: str) -> None:
+        refs = self._blob_refs.get(content_hash, 0) - 1
+        if refs > 0:
+            self._blob_refs[content_hash] = refs
+            return  # Still shared with another URL
+        self._blob_refs.pop(content_hash, None)
+        self._size_bytes -= self._blob_sizes.pop(content_hash, 0)
+        try:
+            os.remove(self._blob_path(content_hash))
+        except OSError:
+            pass
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored images."""
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ImageProxy:
+    """Fetches provider images through an ImageCache and serves them with cache headers."""
+
+    TIMEOUT = 10  # Default upstream timeout in seconds
+    MAX_IMAGE_BYTES = 5 * 1024 * 1024
+    MAX_REDIRECTS = 3
+
+    def __init__(self, cache: ImageCache, allowed_hosts: Iterable[str] = DEFAULT_ALLOWED_HOSTS,
+                 route: str = "/images", timeout: float = TIMEOUT):
+        """
+        Initialize the proxy.
+
+        Args:
+            cache: Disk cache for fetched images.
+            allowed_hosts: Upstream hosts (optionally host:port) that may be fetched.
+            route: Path our server serves the proxy on, used by `proxy_url`.
+            timeout: Upstream request timeout in seconds.
+        """
+        self.cache = cache
+        self.allowed_hosts = frozenset(h.lower() for h in allowed_hosts)
+        self.route = route
+        self.timeout = timeout
+
+    def proxy_url(self, image_url: Optional[str], width: int = CARD_WIDTH,
+                  height: int = CARD_HEIGHT) -> Optional[str]:
+        """
+        URL on our server for the card-size variant of an image.
+
+        Args:
+            image_url: The recipe's image URL.
+            width: Display width in pixels.
+            height: Display height in pixels.
+
+        Returns:
+            The proxied URL, or `image_url` unchanged if it is empty or on a
+            host the proxy does not fetch from.
+        """
+        variant = select_variant(image_url, width, height)
+        if not variant or not self._allowed(variant):
+            return image_url
+        return f"{self.route}?url={quote(variant, safe='')}"
+
+    def _allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return False
+        return parts.hostname.lower() in self.allowed_hosts or parts.netloc.lower() in self.allowed_hosts
+
+    def serve(self, url: str, if_none_match: Optional[str] = None,
+              deadline: Optional[Deadline] = None) -> ImageResponse:
+        """
+        Answer a proxy request for an image URL.
+
+        Args:
+            url: The upstream image URL (the `url` query parameter).
+            if_none_match: The request's If-None-Match header.
+            deadline: Optional deadline for the upstream fetch.
+
+        Returns:
+            200 with the image, 304 if the client's copy is current, 403 for
+            hosts not allowed, 404 if upstream has no such image, 502 for
+            other upstream failures and 504 on timeout.
+        """
+        if not self._allowed(url):
+            return ImageResponse(403)
+
+        cached = self.cache.get(url)
+        if cached is None:
+            fetched = self._fetch(url, deadline)
+            if isinstance(fetched, ImageResponse):
+                return fetched
+            data, content_type = fetched
+            content_hash = self.cache.put(url, data, content_type)
+        else:
+            data, content_type, content_hash = cached
+
+        etag = f'"{content_hash}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return ImageResponse(304, b"", headers)
+        headers["Content-Type"] = content_type
+        headers["Content-Length"] = str(len(data))
+        return ImageResponse(200, data, headers)
+
+    def _fetch(self, url: str, deadline: Optional[Deadline]):
+        try:
+            # Redirects are followed by hand so that every hop is checked
+            # against the allowed hosts, not only the first URL
+            for _ in range(self.MAX_REDIRECTS + 1):
+                timeout = deadline.timeout(self.timeout) if deadline is not None else self.timeout
+                with span("network", SPAN_KIND_CLIENT, provider="image", host=urlsplit(url).hostname) as s:
+                    with requests.get(url, timeout=timeout, stream=True, allow_redirects=False) as response:
+                        s.set_attribute("http.status_code", response.status_code)
+                        if response.is_redirect:
+                            target = urljoin(url, response.headers["Location"])
+                            if not self._allowed(target):
+                                logger.warning(f"Refusing to follow redirect from {url} to {target}")
+                                return ImageResponse(502)
+                            url = target
+                            continue
+                        if response.status_code == 404:
+                            return ImageResponse(404)
+                        response.raise_for_status()
+                        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                        if not content_type.startswith("image/"):
+                            logger.warning(f"Refusing to proxy non-image content ({content_type or 'unknown'}) from {url}")
+                            return ImageResponse(502)
+                        chunks, size = [], 0
+                        for chunk in response.iter_content(64 * 1024):
+                            size += len(chunk)
+                            if size > self.MAX_IMAGE_BYTES:
+                                logger.warning(f"Image larger than {self.MAX_IMAGE_BYTES} bytes at {url}")
+                                return ImageResponse(502)
+                            chunks.append(chunk)
+                        s.set_attribute("bytes", size)
+                return b"".join(chunks), content_type
+            logger.error(f"Too many redirects for {url}")
+            return ImageResponse(502)
+        except (requests.exceptions.Timeout, DeadlineExceeded):
+            logger.error(f"Image request timed out for {url}")
+            return ImageResponse(504)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Image request error for {url}: {e}")
+            return ImageResponse(502)
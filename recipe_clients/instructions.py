@@ -0,0 +1,151 @@
+# recipe_clients/instructions.py
+"""Normalization of recipe instructions into a list of steps.
+
+Providers send instructions as free text (TheMealDB's strInstructions,
+Spoonacular's instructions, which may contain HTML lists) and, for
+Spoonacular, also as structured analyzedInstructions. Both end up as a list
+of step strings, each ending in punctuation:
+
+    "Boil the pasta.\\r\\nSTEP 2\\r\\nDrain it" -> ["Boil the pasta.", "Drain it."]
+
+Structured steps are used when present, since they need no guessing where a
+step ends. `normalize_many` normalizes a whole batch (e.g. a catalog
+snapshot) in one call.
+"""
+
+import html
+import re
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Union
+
+_HTML_BREAK_RE = re.compile(r"<\s*(?:br|/li|/p|/ol|/ul|/div)\s*/?\s*>", re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+# Step numbering the providers put in the text ("STEP 1", "1.", "2)")
+_STEP_MARKER_RE = re.compile(r"^(?:step\s*\d+\s*[:.)-]?|\d+\s*[.)](?!\d))\s*", re.IGNORECASE)
+_DIGITS = frozenset("0123456789")
+
+InstructionText = Union[str, Sequence[str], None]
+
+
+def _strip_html(text: str) -> str:
+    if "<" in text:
+        text = _HTML_TAG_RE.sub("", _HTML_BREAK_RE.sub("\n", text))
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+def _split_text(text: str) -> List[str]:
+    # A step ends at a period followed by a space or at a line break. Plain
+    # str.split is faster than a regex here, so line breaks and tabs are
+    # first rewritten into the ". " it splits on.
+    if "\r" in text:
+        text = text.replace("\r", "")
+    if "\n" in text:
+        text = text.replace(".\n", ". ").replace("\n", ". ")
+    if "\t" in text:
+        text = text.replace("\t", " ")
+    return text.split(". ")
+
+
+def _clean_steps(pieces: Iterable[str], headings: bool = False) -> List[str]:
+    """Strip pieces, drop empty ones and step numbering, and end each with punctuation."""
+    strip_marker = _STEP_MARKER_RE.sub
+    steps = []
+    append = steps.append
+    for p in pieces:
+        p = p.strip()
+        if not p:
+            continue
+        if p[0] in _DIGITS:
+            if p.isdigit():
+                continue  # Inline numbering ("1. Preheat oven. 2. Bake.") splits into bare numbers
+            p = strip_marker("", p)
+        if headings:
+            p = strip_marker("", p)
+        if p:
+            append(p if p[-1] in ".!?" else p + ".")
+    return steps
+
+
+def split_instructions(text: Optional[str]) -> List[str]:
+    """
+    Split free-text instructions into steps.
+
+    Args:
+        text: Instruction text, possibly containing HTML.
+
+    Returns:
+        The steps, each ending in punctuation; empty if there are none.
+    """
+    if not text:
+        return []
+    text = _strip_html(text)
+    return _clean_steps(_split_text(text), "tep" in text or "TEP" in text)
+
+
+def steps_from_analyzed(analyzed: Optional[Sequence[Mapping[str, Any]]]) -> List[str]:
+    """
+    Steps of Spoonacular analyzedInstructions.
+
+    Args:
+        analyzed: The analyzedInstructions list of sections, each with a
+                  'steps' list of {'number', 'step'} dictionaries.
+
+    Returns:
+        The steps of all sections in order; empty if there are none.
+    """
+    if not analyzed:
+        return []
+    return _clean_steps(
+        step.get("step") or ""
+        for section in analyzed if isinstance(section, Mapping)
+        for step in section.get("steps") or ()
+    )
+
+
+def normalize_instructions(instructions: InstructionText = None,
+                           analyzed: Optional[Sequence[Mapping[str, Any]]] = None) -> List[str]:
+    """
+    Normalize one recipe's instructions.
+
+    Args:
+        instructions: Free text, or a list of steps already split.
+        analyzed: Spoonacular analyzedInstructions, preferred when it has steps.
+
+    Returns:
+        The steps, each ending in punctuation.
+    """
+    steps = steps_from_analyzed(analyzed)
+    if steps:
+        return steps
+    if isinstance(instructions, str):
+        return split_instructions(instructions)
+    return _clean_steps(instructions or ())
+
+
+def normalize_many(items: Iterable[Union[InstructionText, Mapping[str, Any]]]) -> List[List[str]]:
+    """
+    Normalize the instructions of many recipes.
+
+    Args:
+        items: Per recipe, instruction text, a list of steps, or a raw
+               provider dictionary (its 'analyzedInstructions', 'instructions'
+               or 'strInstructions' are used).
+
+    Returns:
+        The steps of each item, in order.
+    """
+    results = []
+    append = results.append
+    for item in items:
+        if isinstance(item, Mapping):
+            steps = steps_from_analyzed(item.get("analyzedInstructions"))
+            if steps:
+                append(steps)
+                continue
+            item = item.get("instructions") or item.get("strInstructions")
+        if isinstance(item, str):
+            append(split_instructions(item))
+        else:
+            append(_clean_steps(item or ()))
+    return results
@@ -0,0 +1,308 @@
+# recipe_clients/meal_planner.py
+"""Meal-plan generation over locally cached recipes.
+
+Plans are built greedily: each slot takes the candidate with the best
+score given the recipes already chosen, followed by one improvement pass
+that re-picks every slot with the rest of the plan fixed. The score
+rewards ingredients already on the shopping list and penalizes repeating a
+cuisine. Shared-ingredient counts for all candidates are recomputed with a
+single NumPy bincount over a flat (candidate, ingredient) list. That list
+is gathered from a `PlanningIndex`, which keeps every recipe's canonical
+ingredient IDs in flat arrays and is updated as recipes arrive, so no
+per-ingredient Python work is left in a planning call and no upstream
+calls are made.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .filter_index import RecipeFilterIndex
+from .recipe_client_abc import Recipe
+from .shopping_list import canonical_ingredient_name
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MealPlanDay:
+    """The meals chosen for one day of a plan."""
+    day: int  # 1-based day number
+    meals: List[Recipe] = field(default_factory=list)
+
+
+@dataclass
+class MealPlan:
+    """A generated meal plan."""
+    days: List[MealPlanDay] = field(default_factory=list)
+    total_time_minutes: int = 0
+    unique_ingredients: int = 0
+    shared_ingredients: List[str] = field(default_factory=list)  # Used by 2+ meals
+    unfilled_slots: int = 0  # Slots left empty because no candidate fit
+
+    @property
+    def recipes(self) -> List[Recipe]:
+        """All planned recipes in day order."""
+        return [recipe for day in self.days for recipe in day.meals]
+
+
+class PlanningIndex:
+    """
+    Canonical ingredient IDs, cuisine and total time of each recipe, as flat arrays.
+
+    Ingredient IDs of all recipes are concatenated in one array with an
+    offsets array marking where each recipe's run starts (CSR layout), so
+    the rows of any set of recipes can be gathered with array indexing.
+    Recipes added since the last gather are merged in on the next one.
+    Adding a recipe whose ID is already indexed is a no-op.
+    """
+
+    def __init__(self, recipes: Optional[Iterable[Recipe]] = None):
+        """
+        Initialize the index, optionally with recipes.
+
+        Args:
+            recipes: Recipes to index.
+        """
+        self._slots: Dict[str, int] = {}
+        self._vocab: Dict[str, int] = {}
+        self._cuisine_ids: Dict[str, int] = {}
+        self._pending: List[Tuple[List[int], int, float]] = []  # (ingredient IDs, cuisine ID, time)
+        self._ingredient_ids = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._cuisines = np.empty(0, dtype=np.int64)
+        self._times = np.empty(0, dtype=np.float64)
+        self._lock = threading.Lock()
+        if recipes:
+            self.add_many(recipes)
+
+    def add(self, recipe: Recipe) -> None:
+        """
+        Index a recipe.
+
+        Args:
+            recipe: The recipe to index.
+        """
+        with self._lock:
+            self._add(recipe)
+
+    def add_many(self, recipes: Iterable[Recipe]) -> None:
+        """Index several recipes."""
+        with self._lock:
+            for recipe in recipes:
+                self._add(recipe)
+
+    def _add(self, recipe: Recipe) -> None:
+        if recipe.id in self._slots:
+            return
+        self._slots[recipe.id] = len(self._slots)
+        vocab = self._vocab
+        ingredient_ids = [vocab.setdefault(name, len(vocab))
+                          for name in {canonical_ingredient_name(ing.name) for ing in recipe.ingredients}]
+        cuisine = (self._cuisine_ids.setdefault(recipe.cuisine_tags[0].lower(), len(self._cuisine_ids))
+                   if recipe.cuisine_tags else -1)
+        self._pending.append((ingredient_ids, cuisine, float(recipe.total_time_minutes or 0)))
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        counts = np.fromiter((len(ids) for ids, _, _ in pending), dtype=np.int64, count=len(pending))
+        self._ingredient_ids = np.concatenate([
+            self._ingredient_ids,
+            np.fromiter((i for ids, _, _ in pending for i in ids), dtype=np.int64, count=int(counts.sum())),
+        ])
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(counts)])
+        self._cuisines = np.concatenate([self._cuisines, np.fromiter((c for _, c, _ in pending), dtype=np.int64)])
+        self._times = np.concatenate([self._times, np.fromiter((t for _, _, t in pending), dtype=np.float64)])
+
+    def gather(self, recipes: List[Recipe]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, int]:
+        """
+        Arrays describing `recipes`, indexing any that are not indexed yet.
+
+        Args:
+            recipes: The candidate recipes, in the order positions refer to.
+
+        Returns:
+            (owners, ingredient_ids, cuisines, times, vocabulary size, number
+            of cuisines): for every (recipe, ingredient) pair the recipe's
+            position and the ingredient's ID, then per recipe its cuisine ID
+            (-1 if none) and total time in minutes (0 if unknown).
+        """
+        with self._lock:
+            for recipe in recipes:
+                if recipe.id not in self._slots:
+                    self._add(recipe)
+            self._merge()
+            slots = np.fromiter((self._slots[r.id] for r in recipes), dtype=np.int64, count=len(recipes))
+            starts = self._offsets[slots]
+            counts = self._offsets[slots + 1] - starts
+            owners = np.repeat(np.arange(len(recipes), dtype=np.int64), counts)
+            # Position of each gathered pair within its recipe's run, added to the run's start
+            run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+            rows = np.repeat(starts, counts) + np.arange(len(owners), dtype=np.int64) - run_starts
+            return (owners, self._ingredient_ids[rows], self._cuisines[slots], self._times[slots],
+                    len(self._vocab), len(self._cuisine_ids))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+class MealPlanner:
+    """
+    Picks recipes for a multi-day plan under time, tag, variety and overlap goals.
+    """
+
+    JITTER = 1e-3  # Scale of the random tie-breaker added to scores
+
+    def __init__(self, overlap_weight: float = 1.0, variety_weight: float = 0.5,
+                 seed: Optional[int] = None):
+        """
+        Initialize the planner's scoring weights.
+
+        Args:
+            overlap_weight: Weight of the fraction of a recipe's ingredients that
+                            are already on the shopping list.
+            variety_weight: Penalty per earlier meal with the same cuisine.
+            seed: Seed for tie-breaking jitter; None gives a different plan per call.
+        """
+        self.overlap_weight = overlap_weight
+        self.variety_weight = variety_weight
+        self.seed = seed
+
+    def plan(self, recipes: Iterable[Recipe], days: int = 7, meals_per_day: int = 1,
+             filters: Optional[Dict[str, Any]] = None,
+             max_total_time: Optional[int] = None,
+             exclude_ids: Optional[Iterable[str]] = None,
+             index: Optional[RecipeFilterIndex] = None,
+             planning_index: Optional[PlanningIndex] = None) -> MealPlan:
+        """
+        Build a meal plan.
+
+        Args:
+            recipes: Candidate recipes (ignored if `index` is given).
+            days: Number of days to plan.
+            meals_per_day: Meals per day.
+            filters: Spoonacular-style filters (diet, cuisine, maxReadyTime, ...)
+                     every planned recipe must satisfy.
+            max_total_time: Budget in minutes for all planned meals together.
+                            Recipes without a known time are not used when set.
+            exclude_ids: Recipe IDs that must not be planned.
+            index: Prebuilt filter index to draw candidates from.
+            planning_index: Prebuilt PlanningIndex over the candidates; one is
+                            built for this call if not provided.
+
+        Returns:
+            The MealPlan. Slots that no remaining candidate can fill are left
+            empty and counted in `unfilled_slots`.
+        """
+        index = index if index is not None else RecipeFilterIndex(recipes)
+        excluded = set(exclude_ids or ())
+        candidates = [r for r in index.query_filters(filters) if r.id not in excluded]
+        if max_total_time is not None:
+            candidates = [r for r in candidates if r.total_time_minutes is not None]
+        slots = days * meals_per_day
+
+        chosen = self._choose(candidates, slots, max_total_time,
+                              planning_index if planning_index is not None else PlanningIndex()) if candidates else []
+        planned = [candidates[position] for position in chosen]
+        if len(planned) < slots:
+            logger.info(f"Only {len(planned)} of {slots} meal slots could be filled from {len(candidates)} candidate(s)")
+
+        ingredient_uses: Dict[str, int] = {}
+        for recipe in planned:
+            for name in {canonical_ingredient_name(ing.name) for ing in recipe.ingredients}:
+                ingredient_uses[name] = ingredient_uses.get(name, 0) + 1
+
+        return MealPlan(
+            days=[
+                MealPlanDay(day=day + 1, meals=planned[day * meals_per_day:(day + 1) * meals_per_day])
+                for day in range(days)
+            ],
+            total_time_minutes=sum(r.total_time_minutes or 0 for r in planned),
+            unique_ingredients=len(ingredient_uses),
+            shared_ingredients=sorted(name for name, uses in ingredient_uses.items() if uses > 1),
+            unfilled_slots=slots - len(planned),
+        )
+
+    def _choose(self, candidates: List[Recipe], slots: int,
+                max_total_time: Optional[int], planning_index: PlanningIndex) -> List[int]:
+        """Pick candidate positions for the plan's slots."""
+        n = len(candidates)
+        owners, ingredient_ids, cuisines, times, vocab_size, cuisine_count = planning_index.gather(candidates)
+        counts = np.bincount(owners, minlength=n)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        sizes = np.maximum(counts, 1).astype(np.float64)
+
+        # Prefer recipes built from commonly used ingredients while the plan is
+        # empty, and break the remaining ties randomly
+        popularity = np.bincount(ingredient_ids, minlength=vocab_size).astype(np.float64)
+        commonness = np.bincount(owners, weights=popularity[ingredient_ids], minlength=n) / sizes
+        rng = np.random.default_rng(self.seed)
+        base = self.JITTER * (commonness / max(commonness.max(), 1.0) + rng.random(n))
+
+        def scores(plan: List[int]) -> np.ndarray:
+            have = np.zeros(vocab_size, dtype=bool)
+            cuisine_counts = np.zeros(cuisine_count + 1, dtype=np.float64)
+            for position in plan:
+                have[ingredient_ids[offsets[position]:offsets[position + 1]]] = True
+                cuisine_counts[cuisines[position]] += 1  # -1 (no cuisine) uses the spare last cell
+            cuisine_counts[-1] = 0.0
+            shared = np.bincount(owners, weights=have[ingredient_ids], minlength=n)
+            result = base + self.overlap_weight * shared / sizes
+            result -= self.variety_weight * cuisine_counts[cuisines]
+            result[plan] = -np.inf  # Never repeat a recipe
+            return result
+
+        def feasible(plan: List[int], slots_left: int) -> np.ndarray:
+            if max_total_time is None:
+                return np.ones(n, dtype=bool)
+            remaining = max_total_time - times[plan].sum()
+            unused = np.ones(n, dtype=bool)
+            unused[plan] = False
+            cheapest = np.sort(times[unused])[:slots_left]
+            # Leave room for the cheapest recipes in the slots after this one
+            reserve = cheapest[:slots_left - 1].sum() if slots_left > 1 else 0.0
+            return times <= remaining - reserve
+
+        plan: List[int] = []
+        for slot in range(slots):
+            score = np.where(feasible(plan, slots - slot), scores(plan), -np.inf)
+            best = int(np.argmax(score))
+            if not np.isfinite(score[best]):
+                break
+            plan.append(best)
+
+        # One improvement pass: re-pick each slot with the others fixed
+        for i in range(len(plan)):
+            others = plan[:i] + plan[i + 1:]
+            score = np.where(feasible(others, 1), scores(others), -np.inf)
+            best = int(np.argmax(score))
+            if np.isfinite(score[best]):
+                plan[i] = best
+        return plan
+
+
+def plan_meals(recipes: Iterable[Recipe], days: int = 7, meals_per_day: int = 1,
+               filters: Optional[Dict[str, Any]] = None,
+               max_total_time: Optional[int] = None,
+               seed: Optional[int] = None) -> MealPlan:
+    """
+    Build a meal plan with the default MealPlanner weights.
+
+    Args:
+        recipes: Candidate recipes.
+        days: Number of days to plan.
+        meals_per_day: Meals per day.
+        filters: Spoonacular-style filters every planned recipe must satisfy.
+        max_total_time: Budget in minutes for all planned meals together.
+        seed: Seed for tie-breaking; None gives a different plan per call.
+
+    Returns:
+        The generated MealPlan.
+    """
+    return MealPlanner(seed=seed).plan(recipes, days, meals_per_day, filters, max_total_time)
@@ -2,92 +2,205 @@
 """Adapter for MealDB client to follow the standard recipe client interface."""
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Sequence, Union
 
-from .recipe_client_abc import RecipeClient, Recipe, RecipeIngredient
-from .mealdb_client import MealDBClient, MealDetail
+from .recipe_client_abc import ProviderError, RecipeClient, Recipe, RecipeIngredient
+from .recipe_store import RecipeStore
+from .deadline import Deadline
+from .instructions import split_instructions
+from .mealdb_client import MealDBClient, MealDetail, MealSummary
+from .measures import parse_measure
+from .tracing import span
+
+if TYPE_CHECKING:  # Imported lazily at runtime to keep NumPy out of cold starts
+    from .mealdb_filter_index import MealDBFilterIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Filters TheMealDB data can answer; it has no cooking times or servings, so
+# maxReadyTime, minServings and maxServings would drop every meal
+MEALDB_FILTERS = ("diet", "cuisine", "excludeCuisine")
+
+# TheMealDB categories that are diets; a vegan meal is vegetarian as well
+DIETARY_CATEGORIES = {"Vegetarian": ["Vegetarian"], "Vegan": ["Vegan", "Vegetarian"]}
+
+
+def _dietary_tags(tags: Optional[str], category: Optional[str]) -> List[str]:
+    """Dietary tags of a meal: its strTags plus any diet its category implies."""
+    dietary = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
+    known = {tag.lower() for tag in dietary}
+    dietary.extend(tag for tag in DIETARY_CATEGORIES.get(category or "", []) if tag.lower() not in known)
+    return dietary
+
 
 class MealDBAdapter(RecipeClient):
     """Adapter for MealDBClient to conform to the RecipeClient interface."""
+    source_api = "themealdb"
     
     def __init__(self, api_key: Optional[str] = None):
         """Initialize with optional API key for MealDB."""
         self.client = MealDBClient(api_key=api_key) if api_key else MealDBClient()
+        self._filter_index = None
+    
+    @property
+    def filter_index(self) -> "MealDBFilterIndex":
+        """Cached TheMealDB filter lists, created on first use."""
+        if self._filter_index is None:
+            from .mealdb_filter_index import MealDBFilterIndex
+            self._filter_index = MealDBFilterIndex(self.client)
+        return self._filter_index
     
-    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Recipe]:
+    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None) -> List[Recipe]:
         """
         Search for recipes by name.
         
         Args:
             query: The search query (recipe name).
-            filters: Optional filters (not supported by free MealDB).
+            filters: Optional Spoonacular-style filters (diet, cuisine, ...).
+                     MealDB does not support them, so they are applied locally;
+                     time and servings filters are ignored (see MEALDB_FILTERS).
+            deadline: Optional deadline. Each detail lookup gets only the
+                      remaining time; lookups left when it passes are skipped
+                      and the recipes fetched so far are returned.
             
         Returns:
             Standardized Recipe objects matching the query.
+            
+        Raises:
+            ProviderError: If the search or any detail lookup failed. Recipes
+                           whose lookups succeeded are in its `partial`.
         """
-        # MealDB free API doesn't support filters, so we ignore them
-        meal_summaries = self.client.search_recipes_by_name(query)
+        meal_summaries = self.client.search_recipes_by_name(query, deadline=deadline, raise_errors=True)
+        
+        # Apply filters to the summaries (which carry area and tags) so that
+        # details are only looked up for meals that pass
+        filters = {key: value for key, value in (filters or {}).items() if key in MEALDB_FILTERS}
+        if filters:
+            from .filter_index import filter_recipes
+            stubs = {stub.source_id: stub for stub in map(self._convert_meal_summary_to_recipe, meal_summaries)}
+            matching = {recipe.source_id for recipe in filter_recipes(stubs.values(), filters)}
+            meal_summaries = [summary for summary in meal_summaries if summary.id_meal in matching]
         
         # Convert to standardized Recipe objects
         recipes = []
-        for summary in meal_summaries:
+        failed = 0
+        for position, summary in enumerate(meal_summaries):
+            if deadline is not None and deadline.expired:
+                deadline.mark_skipped(f"{len(meal_summaries) - position} MealDB detail lookup(s) for '{query}'")
+                break
             # For each summary, we need to get the full details to get ingredients
-            detail = self.client.get_recipe_details_by_id(summary.id_meal)
+            try:
+                detail = self.client.get_recipe_details_by_id(summary.id_meal, deadline=deadline, raise_errors=True)
+            except ProviderError:
+                failed += 1
+                continue
             if detail:
-                recipes.append(self._convert_meal_detail_to_recipe(detail))
+                with span("adapt", provider="themealdb", count=1):
+                    recipes.append(self._convert_meal_detail_to_recipe(detail))
         
+        if failed:
+            # Missing meals would otherwise be cached as if the search had not found them
+            raise ProviderError(f"{failed} of {len(meal_summaries)} TheMealDB detail lookup(s) for '{query}' failed",
+                                partial=recipes)
         return recipes
     
-    def get_recipe_by_id(self, recipe_id: str) -> Optional[Recipe]:
+    def get_recipe_by_id(self, recipe_id: str, deadline: Optional[Deadline] = None) -> Optional[Recipe]:
         """
         Get recipe details by ID.
         
         Args:
             recipe_id: The MealDB recipe ID.
+            deadline: Optional deadline for the lookup.
             
         Returns:
-            Standardized Recipe object if found, None otherwise.
+            Standardized Recipe object if found, None if TheMealDB has no such meal.
+            
+        Raises:
+            ProviderError: If the lookup failed.
         """
         # Strip any prefix if this is a standardized ID
         if recipe_id.startswith("themealdb_"):
-            recipe_id = recipe_id[9:]  # Remove "themealdb_" prefix
+            recipe_id = recipe_id[len("themealdb_"):]  # Remove "themealdb_" prefix
         
-        detail = self.client.get_recipe_details_by_id(recipe_id)
+        detail = self.client.get_recipe_details_by_id(recipe_id, deadline=deadline, raise_errors=True)
         if not detail:
             return None
         
-        return self._convert_meal_detail_to_recipe(detail)
+        with span("adapt", provider="themealdb", count=1):
+            return self._convert_meal_detail_to_recipe(detail)
+    
+    def find_recipes(self, ingredients: Union[str, Sequence[str], None] = None,
+                     category: Union[str, Sequence[str], None] = None,
+                     area: Union[str, Sequence[str], None] = None,
+                     limit: Optional[int] = None,
+                     store: Optional[RecipeStore] = None,
+                     deadline: Optional[Deadline] = None) -> List[Recipe]:
+        """
+        Find recipes matching several filter criteria at once.
+        
+        The criteria are joined locally over cached filter lists (see
+        MealDBFilterIndex), so only lists not cached yet cost a request.
+        Results are hydrated without detail lookups: from `store` when it
+        holds the full recipe, otherwise as a summary recipe without
+        ingredients or steps (use get_recipe_by_id for those).
+        
+        Args:
+            ingredients: Ingredient(s) the recipes must all contain.
+            category: Category, or categories of which any may match.
+            area: Area, or areas of which any may match.
+            limit: Maximum number of recipes to return.
+            store: Optional store of already fetched recipes.
+            deadline: Optional deadline for fetching filter lists.
+            
+        Returns:
+            Matching recipes ordered by MealDB ID, or an empty list if no
+            criteria were given or a list could not be fetched.
+        """
+        ids = self.filter_index.query(ingredients, category, area, deadline=deadline)
+        if ids is None:
+            return []
+        if limit is not None:
+            ids = ids[:limit]
+        
+        recipes = []
+        with span("adapt", provider="themealdb", count=len(ids)):
+            for summary in self.filter_index.summaries(ids):
+                recipe = store.get(f"themealdb_{summary.id_meal}") if store is not None else None
+                recipes.append(recipe or self._convert_meal_summary_to_recipe(summary))
+        return recipes
+    
+    def _convert_meal_summary_to_recipe(self, meal: MealSummary) -> Recipe:
+        """Convert a MealDB search summary to a Recipe without ingredients or steps."""
+        return Recipe(
+            id=f"themealdb_{meal.id_meal}",
+            source_api="themealdb",
+            source_id=meal.id_meal,
+            name=meal.meal_name,
+            image_url=meal.meal_thumb,
+            source_url=meal.source_url,
+            cuisine_tags=[meal.area] if meal.area else [],
+            dietary_tags=_dietary_tags(meal.tags, meal.category)
+        )
     
     def _convert_meal_detail_to_recipe(self, meal: MealDetail) -> Recipe:
         """Convert MealDB detail object to standardized Recipe."""
         # Convert ingredients
         ingredients = []
         for ing in meal.ingredients:
+            measure = parse_measure(ing.measure)
             ingredients.append(
                 RecipeIngredient(
                     name=ing.name,
+                    amount=measure.amount,
+                    unit=measure.unit,
                     original_text=f"{ing.name} - {ing.measure}" if ing.measure else ing.name,
-                    # Amount and unit are difficult to parse from the string measure
-                    # We'd need additional parsing logic to extract these reliably
                 )
             )
         
-        # Split instructions into steps if it's a single string
-        instructions = []
-        if meal.instructions:
-            # Split by periods followed by whitespace or newlines
-            import re
-            steps = re.split(r'\.(?:\s+|\n+)', meal.instructions)
-            instructions = [step.strip() + "." for step in steps if step.strip()]
-        
-        # Extract tags
-        tags = []
-        if meal.tags:
-            tags = [tag.strip() for tag in meal.tags.split(",")]
+        # Split the instruction text into steps
+        instructions = split_instructions(meal.instructions)
         
         # Create standardized recipe
         return Recipe(
@@ -101,5 +214,5 @@ class MealDBAdapter(RecipeClient):
             source_url=meal.source_url,
             # MealDB doesn't provide timing information
             cuisine_tags=[meal.area] if meal.area else [],
-            dietary_tags=tags
+            dietary_tags=_dietary_tags(meal.tags, meal.category)
         )
@@ -7,13 +7,14 @@ from typing import List, Optional
 from pydantic import ValidationError
 
 # Use relative import within the package
+from .concurrency import limiter_for
+from .deadline import Deadline, DeadlineExceeded
 from .models import MealSearchResponse, MealDetailResponse, MealSummary, MealDetail
+from .recipe_client_abc import ProviderError
+from .tracing import SPAN_KIND_CLIENT, span
 
 # Configure logging
 logger = logging.getLogger(__name__)
-# Configure basic logging if no handlers are already configured
-if not logger.hasHandlers():
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 
 class MealDBClient:
@@ -21,6 +22,9 @@ class MealDBClient:
     BASE_URL = "https://www.themealdb.com/api/json/v1/1/"
     API_KEY = "1" # Test API key provided by TheMealDB
     TIMEOUT = 10 # Default request timeout in seconds
+    FILTER_PARAMS = {'ingredient': 'i', 'category': 'c', 'area': 'a'} # filter.php query parameters
+    LIST_FIELDS = {'ingredient': 'strIngredient', 'category': 'strCategory', 'area': 'strArea'} # list.php name fields
+    MAX_CONCURRENCY = 16 # Upper bound for the adaptive limit on parallel requests
 
     def __init__(self, api_key: str = API_KEY, timeout: int = TIMEOUT):
         """Initializes the MealDBClient."""
@@ -29,17 +33,43 @@ class MealDBClient:
         # Ensure the URL ends with a slash before appending endpoint
         self.base_url = self.BASE_URL.replace('/v1/1/', f'/v1/{self.api_key}/').rstrip('/') + '/'
         self.timeout = timeout
+        self.limiter = limiter_for("themealdb", max_limit=self.MAX_CONCURRENCY)
         logger.info(f"MealDBClient initialized for base URL: {self.base_url.replace(self.api_key,'{api_key}')}")
 
-    def _make_request(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
-        """Makes a GET request to a specified TheMealDB endpoint."""
+    def _make_request(self, endpoint: str, params: Optional[dict] = None,
+                      deadline: Optional[Deadline] = None) -> Optional[dict]:
+        """Makes a GET request to a specified TheMealDB endpoint.
+
+        With a deadline, the request timeout is capped at the remaining time,
+        and no request is made once the deadline has passed. Requests over the
+        provider's adaptive concurrency limit wait for a slot (see concurrency.py).
+        """
         url = f"{self.base_url}{endpoint}"
+        timeout = self.timeout
+        if deadline is not None and deadline.expired:
+            logger.warning(f"Deadline exceeded; skipping request to {url}")
+            deadline.mark_skipped(f"TheMealDB {endpoint} {params}")
+            return None
         try:
-            response = requests.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            return response.json()
+            with self.limiter.request(deadline, endpoint=endpoint) as permit:
+                if deadline is not None:
+                    timeout = deadline.timeout(self.timeout)
+                with span("network", SPAN_KIND_CLIENT, provider="themealdb", endpoint=endpoint) as s:
+                    response = requests.get(url, params=params, timeout=timeout)
+                    s.set_attribute("http.status_code", response.status_code)
+                if response.status_code == 429 or response.status_code >= 500:
+                    permit.overloaded()
+                response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            with span("decode", provider="themealdb", endpoint=endpoint, bytes=len(response.content)):
+                return response.json()
+        except DeadlineExceeded:
+            logger.warning(f"Deadline exceeded while waiting to request {url}")
+            deadline.mark_skipped(f"TheMealDB {endpoint} {params}")
+            return None
         except requests.exceptions.Timeout:
             logger.error(f"Request timed out for {url}")
+            if deadline is not None and deadline.expired:
+                deadline.mark_skipped(f"TheMealDB {endpoint} {params} (timed out at deadline)")
             return None
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error occurred for {url}: {e.response.status_code} - {e.response.reason}")
@@ -51,11 +81,15 @@ class MealDBClient:
             logger.error(f"Error decoding JSON response from {url}")
             return None
 
-    def search_recipes_by_name(self, query: str) -> List[MealSummary]:
+    def search_recipes_by_name(self, query: str, deadline: Optional[Deadline] = None,
+                               raise_errors: bool = False) -> List[MealSummary]:
         """Searches for recipes by name/keyword.
 
         Args:
             query: The keyword or phrase to search for.
+            deadline: Optional deadline; the request gets only the remaining time.
+            raise_errors: Raise ProviderError if the request or validation
+                          fails, instead of returning an empty list.
 
         Returns:
             A list of MealSummary objects, or an empty list if no results or error.
@@ -63,27 +97,32 @@ class MealDBClient:
         endpoint = "search.php"
         params = {'s': query}
         logger.info(f"Searching TheMealDB for recipes matching: '{query}'")
-        raw_data = self._make_request(endpoint, params)
+        raw_data = self._make_request(endpoint, params, deadline)
 
         if not raw_data:
-            return []
+            return self._failed(f"TheMealDB search for '{query}' failed", raise_errors, [])
         
         try:
             # Validate the overall structure
-            response_model = MealSearchResponse.model_validate(raw_data)
+            with span("validate", provider="themealdb", model="MealSearchResponse"):
+                response_model = MealSearchResponse.model_validate(raw_data)
             # API returns {'meals': null} if no results
             results = response_model.meals if response_model.meals else [] 
             logger.info(f"Found {len(results)} recipe summary(s) matching '{query}'.")
             return results
         except ValidationError as e:
             logger.error(f"Failed to validate search response for '{query}': {e}")
-            return []
+            return self._failed(f"Invalid TheMealDB search response for '{query}'", raise_errors, [])
 
-    def get_recipe_details_by_id(self, meal_id: str) -> Optional[MealDetail]:
+    def get_recipe_details_by_id(self, meal_id: str, deadline: Optional[Deadline] = None,
+                                 raise_errors: bool = False) -> Optional[MealDetail]:
         """Looks up the full details of a recipe by its ID.
 
         Args:
             meal_id: The ID of the meal (e.g., '52772').
+            deadline: Optional deadline; the request gets only the remaining time.
+            raise_errors: Raise ProviderError if the request or validation
+                          fails, so None only means there is no such meal.
 
         Returns:
             A MealDetail object if found, otherwise None.
@@ -91,23 +130,26 @@ class MealDBClient:
         endpoint = "lookup.php"
         params = {'i': meal_id}
         logger.info(f"Fetching TheMealDB details for meal ID: {meal_id}")
-        raw_data = self._make_request(endpoint, params)
+        raw_data = self._make_request(endpoint, params, deadline)
 
         if not raw_data:
-            return None
+            return self._failed(f"TheMealDB lookup of meal {meal_id} failed", raise_errors, None)
 
         try:
             # The API returns {'meals': [ {meal_details_dict} ]} or {'meals': null}
-            response_model = MealDetailResponse.model_validate(raw_data) 
+            with span("validate", provider="themealdb", model="MealDetail"):
+                response_model = MealDetailResponse.model_validate(raw_data) 
+                meal_detail = None
+                if response_model.meals and len(response_model.meals) == 1:
+                    # Now validate the inner meal dictionary using MealDetail model
+                    # Pass the raw dictionary from the list to MealDetail for validation
+                    # including the ingredient parsing logic
+                    meal_data_dict = response_model.meals[0]
+                    # Add the raw dict to 'raw_fields' for the validator
+                    meal_data_dict['raw_fields'] = meal_data_dict 
+                    meal_detail = MealDetail.model_validate(meal_data_dict)
             
-            if response_model.meals and len(response_model.meals) == 1:
-                # Now validate the inner meal dictionary using MealDetail model
-                # Pass the raw dictionary from the list to MealDetail for validation
-                # including the ingredient parsing logic
-                meal_data_dict = response_model.meals[0]
-                # Add the raw dict to 'raw_fields' for the validator
-                meal_data_dict['raw_fields'] = meal_data_dict 
-                meal_detail = MealDetail.model_validate(meal_data_dict)
+            if meal_detail is not None:
                 logger.info(f"Successfully fetched and validated details for meal ID: {meal_id}")
                 return meal_detail
             else:
@@ -115,65 +157,111 @@ class MealDBClient:
                 return None
         except ValidationError as e:
             logger.error(f"Failed to validate lookup response for meal ID '{meal_id}': {e}")
-            return None
+            return self._failed(f"Invalid TheMealDB lookup response for meal {meal_id}", raise_errors, None)
 
-    def search_recipes_by_ingredient(self, ingredient: str) -> List[MealSummary]:
-        """Searches for recipes by main ingredient.
+    @staticmethod
+    def _failed(message: str, raise_errors: bool, default):
+        """Raise ProviderError for a failed call, or return the caller's empty default."""
+        if raise_errors:
+            raise ProviderError(message)
+        return default
+
+    def filter_meals(self, kind: str, value: str,
+                     deadline: Optional[Deadline] = None) -> Optional[List[MealSummary]]:
+        """Lists the meals matching one filter.php criterion.
 
         Args:
-            ingredient: The ingredient name to filter by (e.g., 'chicken_breast').
+            kind: 'ingredient', 'category' or 'area' (see FILTER_PARAMS).
+            value: The value to filter by (e.g., 'chicken_breast', 'Seafood', 'Indian').
+            deadline: Optional deadline; the request gets only the remaining time.
 
         Returns:
-            A list of MealSummary objects, or an empty list if no results or error.
+            A list of MealSummary objects (possibly empty if nothing matches),
+            or None if the request or validation failed.
             Note: Filter results only include name, thumbnail, and ID.
         """
         endpoint = "filter.php"
-        params = {'i': ingredient}
-        logger.info(f"Searching TheMealDB for recipes containing ingredient: '{ingredient}'")
-        raw_data = self._make_request(endpoint, params)
+        params = {self.FILTER_PARAMS[kind]: value}
+        logger.info(f"Filtering TheMealDB recipes by {kind}: '{value}'")
+        raw_data = self._make_request(endpoint, params, deadline)
 
         if not raw_data:
-            return []
+            return None
         
         try:
             # Validate the overall structure - uses the same MealSearchResponse model
-            response_model = MealSearchResponse.model_validate(raw_data)
+            with span("validate", provider="themealdb", model="MealSearchResponse"):
+                response_model = MealSearchResponse.model_validate(raw_data)
             # API returns {'meals': null} if no results
             results = response_model.meals if response_model.meals else [] 
-            logger.info(f"Found {len(results)} recipe summary(s) for ingredient '{ingredient}'.")
+            logger.info(f"Found {len(results)} recipe summary(s) for {kind} '{value}'.")
             return results
         except ValidationError as e:
-            logger.error(f"Failed to validate ingredient filter response for '{ingredient}': {e}")
-            return []
+            logger.error(f"Failed to validate {kind} filter response for '{value}': {e}")
+            return None
+
+    def list_filter_values(self, kind: str, deadline: Optional[Deadline] = None) -> Optional[List[str]]:
+        """Lists every value TheMealDB knows for one filter kind, as it spells them.
+
+        Args:
+            kind: 'ingredient', 'category' or 'area' (see FILTER_PARAMS).
+            deadline: Optional deadline; the request gets only the remaining time.
+
+        Returns:
+            The names (e.g. 'Indian', 'Main Course'), or None if the request
+            failed or the response was malformed.
+        """
+        endpoint = "list.php"
+        params = {self.FILTER_PARAMS[kind]: "list"}
+        logger.info(f"Listing TheMealDB {kind} values")
+        raw_data = self._make_request(endpoint, params, deadline)
+
+        if not raw_data or not isinstance(raw_data.get("meals"), list):
+            return None
+        field = self.LIST_FIELDS[kind]
+        return [entry[field] for entry in raw_data["meals"] if isinstance(entry, dict) and entry.get(field)]
+
+    def search_recipes_by_ingredient(self, ingredient: str,
+                                     deadline: Optional[Deadline] = None) -> List[MealSummary]:
+        """Searches for recipes by main ingredient.
+
+        Args:
+            ingredient: The ingredient name to filter by (e.g., 'chicken_breast').
+            deadline: Optional deadline; the request gets only the remaining time.
+
+        Returns:
+            A list of MealSummary objects, or an empty list if no results or error.
+            Note: Filter results only include name, thumbnail, and ID.
+        """
+        return self.filter_meals("ingredient", ingredient, deadline) or []
 
-    def search_recipes_by_category(self, category: str) -> List[MealSummary]:
+    def search_recipes_by_category(self, category: str,
+                                   deadline: Optional[Deadline] = None) -> List[MealSummary]:
         """Searches for recipes by category.
 
         Args:
             category: The category name to filter by (e.g., 'Seafood').
+            deadline: Optional deadline; the request gets only the remaining time.
 
         Returns:
             A list of MealSummary objects, or an empty list if no results or error.
             Note: Filter results only include name, thumbnail, and ID.
         """
-        endpoint = "filter.php"
-        params = {'c': category}
-        logger.info(f"Searching TheMealDB for recipes in category: '{category}'")
-        raw_data = self._make_request(endpoint, params)
+        return self.filter_meals("category", category, deadline) or []
 
-        if not raw_data:
-            return []
-        
-        try:
-            # Validate the overall structure - uses the same MealSearchResponse model
-            response_model = MealSearchResponse.model_validate(raw_data)
-            # API returns {'meals': null} if no results
-            results = response_model.meals if response_model.meals else [] 
-            logger.info(f"Found {len(results)} recipe summary(s) for category '{category}'.")
-            return results
-        except ValidationError as e:
-            logger.error(f"Failed to validate category filter response for '{category}': {e}")
-            return []
+    def search_recipes_by_area(self, area: str,
+                               deadline: Optional[Deadline] = None) -> List[MealSummary]:
+        """Searches for recipes by area (cuisine).
+
+        Args:
+            area: The area name to filter by (e.g., 'Indian').
+            deadline: Optional deadline; the request gets only the remaining time.
+
+        Returns:
+            A list of MealSummary objects, or an empty list if no results or error.
+            Note: Filter results only include name, thumbnail, and ID.
+        """
+        return self.filter_meals("area", area, deadline) or []
 
 # Example Usage (for testing - can be run directly)
 if __name__ == '__main__':
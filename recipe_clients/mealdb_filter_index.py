@@ -0,0 +1,182 @@
+# recipe_clients/mealdb_filter_index.py
+"""Local multi-criteria queries over cached TheMealDB filter lists.
+
+TheMealDB's filter.php accepts a single ingredient, category or area per
+call. This index fetches each list once, keeps it as a sorted array of meal
+IDs and answers compound queries ("chicken + Indian + Main Course") with
+sorted-array intersections, so after the first use of a list a query costs
+no network calls at all. The summaries returned by filter.php (name,
+thumbnail, ID) are kept too, so results can be hydrated without lookups.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .deadline import Deadline
+from .mealdb_client import MealDBClient, MealSummary
+from .tracing import span
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FILTER_KINDS = ("ingredient", "category", "area")
+
+
+def normalize_filter_value(kind: str, value: str) -> str:
+    """Normalize a filter value the way TheMealDB matches it ('Chicken Breast' -> 'chicken_breast')."""
+    value = value.strip().lower()
+    return "_".join(value.split()) if kind == "ingredient" else value
+
+
+def _as_list(value: Union[str, Sequence[str], None]) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class MealDBFilterIndex:
+    """
+    Sorted meal-ID arrays for TheMealDB ingredient, category and area lists.
+
+    Lists are fetched lazily and kept for `ttl` seconds. A list whose fetch
+    fails is not cached, so a transient error does not hide meals until the
+    TTL passes. Summaries get the category and area of the lists they were
+    found in, spelled as TheMealDB's list.php names them.
+    """
+
+    def __init__(self, client: Optional[MealDBClient] = None, ttl: float = 86400.0):
+        """
+        Initialize the index.
+
+        Args:
+            client: The MealDB client used to fetch filter lists.
+            ttl: Seconds a fetched list is reused.
+        """
+        self.client = client or MealDBClient()
+        self.ttl = ttl
+        self._lists: Dict[Tuple[str, str], Tuple[float, np.ndarray]] = {}
+        self._summaries: Dict[int, MealSummary] = {}
+        self._names: Dict[str, Dict[str, str]] = {}  # Kind -> normalized value -> TheMealDB's spelling
+        self._lock = threading.Lock()
+
+    def ids(self, kind: str, value: str, deadline: Optional[Deadline] = None) -> Optional[np.ndarray]:
+        """
+        Sorted meal IDs for one filter value, fetching the list if needed.
+
+        Args:
+            kind: 'ingredient', 'category' or 'area'.
+            value: The filter value.
+            deadline: Optional deadline for the fetch.
+
+        Returns:
+            A sorted int64 array (empty if nothing matches), or None if the
+            list could not be fetched.
+        """
+        if kind not in FILTER_KINDS:
+            raise ValueError(f"Unknown MealDB filter kind: {kind}")
+        key = (kind, normalize_filter_value(kind, value))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lists.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        summaries = self.client.filter_meals(kind, key[1], deadline=deadline)
+        if summaries is None:
+            return None
+        name = self._canonical_name(kind, key[1], deadline) if kind != "ingredient" else None
+        ids = np.unique(np.fromiter((int(s.id_meal) for s in summaries), dtype=np.int64, count=len(summaries)))
+        with self._lock:
+            for summary in summaries:
+                meal_id = int(summary.id_meal)
+                known = self._summaries.get(meal_id)
+                # Filter results omit area and category; fill them from the lists we have seen
+                update = {}
+                for field in ("area", "category"):
+                    field_value = getattr(known, field) if known is not None else None
+                    if not field_value and kind == field:
+                        field_value = name
+                    if field_value:
+                        update[field] = field_value
+                self._summaries[meal_id] = summary.model_copy(update=update) if update else summary
+            self._lists[key] = (now, ids)
+        return ids
+
+    def _canonical_name(self, kind: str, value: str, deadline: Optional[Deadline]) -> Optional[str]:
+        """TheMealDB's spelling of a normalized category or area, or None if unknown."""
+        with self._lock:
+            names = self._names.get(kind)
+        if names is None:
+            listed = self.client.list_filter_values(kind, deadline=deadline)
+            if listed is None:
+                return None  # Not cached, so the next list fetch tries again
+            names = {normalize_filter_value(kind, n): n for n in listed}
+            with self._lock:
+                self._names[kind] = names
+        return names.get(value)
+
+    def query(self, ingredients: Union[str, Sequence[str], None] = None,
+              category: Union[str, Sequence[str], None] = None,
+              area: Union[str, Sequence[str], None] = None,
+              deadline: Optional[Deadline] = None) -> Optional[np.ndarray]:
+        """
+        Meal IDs matching all the given criteria.
+
+        Every ingredient must match; several categories or areas match any
+        of them. Lists not cached yet are fetched first.
+
+        Args:
+            ingredients: Ingredient(s) the meals must all contain.
+            category: Category, or categories of which any may match.
+            area: Area, or areas of which any may match.
+            deadline: Optional deadline for fetching lists.
+
+        Returns:
+            Sorted meal IDs, or None if no criteria were given or a needed
+            list could not be fetched.
+        """
+        groups = [[("ingredient", value)] for value in _as_list(ingredients)]
+        for kind, values in (("category", _as_list(category)), ("area", _as_list(area))):
+            if values:
+                groups.append([(kind, value) for value in values])
+        if not groups:
+            return None
+
+        arrays = []
+        for group in groups:
+            merged = None
+            for kind, value in group:
+                ids = self.ids(kind, value, deadline=deadline)
+                if ids is None:
+                    return None
+                merged = ids if merged is None else np.union1d(merged, ids)
+            arrays.append(merged)
+
+        with span("filter_join", provider="themealdb", lists=len(arrays)) as s:
+            # Smallest list first keeps every intermediate result small
+            arrays.sort(key=len)
+            result = arrays[0]
+            for ids in arrays[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, ids, assume_unique=True)
+            s.set_attribute("count", int(len(result)))
+        return result
+
+    def summaries(self, ids: Iterable[int]) -> List[MealSummary]:
+        """Cached summaries for meal IDs, in the given order."""
+        with self._lock:
+            return [self._summaries[int(i)] for i in ids if int(i) in self._summaries]
+
+    def invalidate(self) -> None:
+        """Forget all cached lists."""
+        with self._lock:
+            self._lists.clear()
+            self._summaries.clear()
+            self._names.clear()
@@ -0,0 +1,206 @@
+# recipe_clients/measures.py
+"""Parsing of free-text ingredient measures and unit normalization.
+
+TheMealDB only gives a free-text measure per ingredient (``strMeasureN``,
+e.g. "1 1/2 cups", "200g", "½ tsp", "Pinch"), and Spoonacular units are
+free text as well ("Tbsp", "tablespoons", "g"). This module turns both into
+an amount plus a canonical unit, and converts mass and volume units to a
+common base (grams and millilitres) so quantities can be summed.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+MASS = "g"
+VOLUME = "ml"
+
+# Canonical unit -> (base unit, factor to the base unit).
+# Count-like units are their own base with factor 1 and are only summed
+# with the same unit.
+UNIT_CONVERSIONS: Dict[str, Tuple[str, float]] = {
+    "g": (MASS, 1.0),
+    "kg": (MASS, 1000.0),
+    "mg": (MASS, 0.001),
+    "oz": (MASS, 28.3495),
+    "lb": (MASS, 453.592),
+    "ml": (VOLUME, 1.0),
+    "l": (VOLUME, 1000.0),
+    "cl": (VOLUME, 10.0),
+    "dl": (VOLUME, 100.0),
+    "tsp": (VOLUME, 4.92892),
+    "tbsp": (VOLUME, 14.7868),
+    "cup": (VOLUME, 236.588),
+    "fl oz": (VOLUME, 29.5735),
+    "pint": (VOLUME, 473.176),
+    "quart": (VOLUME, 946.353),
+    "gallon": (VOLUME, 3785.41),
+}
+
+# Free-text spelling -> canonical unit
+UNIT_ALIASES: Dict[str, str] = {
+    "g": "g", "gr": "g", "gram": "g", "grams": "g", "gramme": "g", "grammes": "g",
+    "kg": "kg", "kgs": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "mg": "mg", "milligram": "mg", "milligrams": "mg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "millilitre": "ml", "millilitres": "ml", "milliliter": "ml", "milliliters": "ml",
+    "l": "l", "litre": "l", "litres": "l", "liter": "l", "liters": "l",
+    "cl": "cl", "dl": "dl",
+    "tsp": "tsp", "tsps": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tbls": "tbsp", "tblsp": "tbsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "fl oz": "fl oz", "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "pint": "pint", "pints": "pint", "pt": "pint",
+    "quart": "quart", "quarts": "quart", "qt": "quart",
+    "gallon": "gallon", "gallons": "gallon",
+    # Count-like units
+    "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can", "tin": "can", "tins": "can",
+    "slice": "slice", "slices": "slice",
+    "piece": "piece", "pieces": "piece", "pcs": "piece",
+    "bunch": "bunch", "bunches": "bunch",
+    "handful": "handful", "handfuls": "handful",
+    "sprig": "sprig", "sprigs": "sprig",
+    "stalk": "stalk", "stalks": "stalk",
+    "pinch": "pinch", "pinches": "pinch",
+    "dash": "dash", "dashes": "dash",
+    "packet": "packet", "packets": "packet", "pack": "packet", "package": "packet",
+    "jar": "jar", "jars": "jar",
+    "leaf": "leaf", "leaves": "leaf",
+    "head": "head", "heads": "head",
+    "stick": "stick", "sticks": "stick",
+    "serving": "serving", "servings": "serving",
+    "large": "large", "medium": "medium", "small": "small",
+}
+
+# Abbreviations whose meaning depends on case: "1 T" is a tablespoon, "1 t" a teaspoon
+CASE_SENSITIVE_ALIASES: Dict[str, str] = {"T": "tbsp", "t": "tsp"}
+
+_VULGAR_FRACTIONS = {
+    "½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75,
+    "⅕": 0.2, "⅖": 0.4, "⅗": 0.6, "⅘": 0.8, "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 0.125,
+    "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+
+# Leading quantities: "1 1/2" or "1/2"; "1.5", "1,5", "1,000", "1½" or "½"; then an optional range end.
+# A comma followed by exactly three digits separates thousands; otherwise it is a decimal comma.
+_FRACTION_RE = re.compile(r"^\s*(?:(?P<whole>\d+)\s+)?(?P<num>\d+)\s*/\s*(?P<den>\d+)")
+_NUMBER_RE = re.compile(
+    r"^\s*(?P<whole>\d{1,3}(?:,\d{3})+(?!\d)(?:\.\d+)?|\d+(?:[.,]\d+)?)?\s*(?P<vulgar>[½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞])?"
+)
+_THOUSANDS_RE = re.compile(r"\d{1,3},\d{3}(?!\d)")
+_RANGE_END_RE = re.compile(r"^\s*(?:-|–|to\b)\s*[\d.,/½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞]+", re.IGNORECASE)
+_LEADING_PARENS_RE = re.compile(r"^\s*\((?P<inner>[^()]*)\)")
+_PARENS_RE = re.compile(r"\([^()]*\)")
+_WORD_RE = re.compile(r"[a-z]+(?:\s+oz|\s+ounces?)?", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ParsedMeasure:
+    """Amount and canonical unit extracted from a free-text measure."""
+    amount: Optional[float] = None
+    unit: Optional[str] = None
+
+
+def normalize_unit(unit: Optional[str]) -> Optional[str]:
+    """
+    Map a free-text unit to its canonical form.
+
+    Case is ignored except for the one-letter abbreviations in
+    CASE_SENSITIVE_ALIASES.
+
+    Args:
+        unit: Unit text such as 'Tablespoons' or 'g'.
+
+    Returns:
+        The canonical unit, or None if the unit is empty or unknown.
+    """
+    if not unit:
+        return None
+    key = unit.strip().rstrip(".")
+    if key in CASE_SENSITIVE_ALIASES:
+        return CASE_SENSITIVE_ALIASES[key]
+    return UNIT_ALIASES.get(key.lower())
+
+
+def parse_measure(measure: Optional[str]) -> ParsedMeasure:
+    """
+    Parse a free-text measure such as TheMealDB's strMeasureN values.
+
+    Ranges ("2-3 tbsp") use their lower bound. Measures without a number but
+    with a known unit ("Pinch") get an amount of 1. A quantity in parentheses
+    right after the amount gives the size of each item ("2 (400g) tins" is
+    800 g); other parenthesised text ("1 cup (240ml)", "(optional)") is
+    ignored.
+
+    Args:
+        measure: The measure text.
+
+    Returns:
+        ParsedMeasure with the amount and canonical unit, either of which may
+        be None if it could not be determined.
+    """
+    if not measure:
+        return ParsedMeasure()
+    text = measure.strip()  # Not lowercased: "T" and "t" are different units
+
+    amount = None
+    match = _FRACTION_RE.match(text)
+    if match:
+        whole, num, den = match.group("whole", "num", "den")
+        if int(den):
+            amount = int(whole or 0) + int(num) / int(den)
+        text = text[match.end():]
+    else:
+        match = _NUMBER_RE.match(text)
+        whole, vulgar = match.group("whole", "vulgar")
+        if whole is not None or vulgar is not None:
+            if whole and _THOUSANDS_RE.match(whole):
+                whole = whole.replace(",", "")
+            amount = float(whole.replace(",", ".")) if whole else 0.0
+            if vulgar is not None:
+                amount += _VULGAR_FRACTIONS[vulgar]
+            text = text[match.end():]
+    if amount is not None:
+        range_end = _RANGE_END_RE.match(text)
+        if range_end:
+            text = text[range_end.end():]
+
+    parens = _LEADING_PARENS_RE.match(text)
+    if parens:
+        size = parse_measure(parens.group("inner"))
+        if size.amount is not None and size.unit is not None:
+            count = amount if amount is not None else 1.0
+            return ParsedMeasure(amount=count * size.amount, unit=size.unit)
+    text = _PARENS_RE.sub(" ", text)
+
+    unit = None
+    word = _WORD_RE.search(text)
+    if word:
+        unit = normalize_unit(word.group(0))
+        if unit is None and " " in word.group(0):
+            unit = normalize_unit(word.group(0).split()[0])
+    if amount is None and unit is not None:
+        amount = 1.0
+    return ParsedMeasure(amount=amount, unit=unit)
+
+
+def to_base_unit(amount: float, unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    """
+    Convert an amount in a canonical unit to its base unit.
+
+    Args:
+        amount: The amount.
+        unit: A canonical unit from `normalize_unit` or `parse_measure`.
+
+    Returns:
+        (amount, base unit). Mass converts to grams and volume to
+        millilitres; count-like units are returned unchanged.
+    """
+    conversion = UNIT_CONVERSIONS.get(unit) if unit else None
+    if conversion is None:
+        return amount, unit
+    base, factor = conversion
+    return amount * factor, base
@@ -0,0 +1,132 @@
+# recipe_clients/negative_cache.py
+"""Short-lived, memory-bounded memory of upstream misses.
+
+Queries that found nothing and recipe IDs that do not exist are remembered
+in Bloom filters, so a repeated miss (typically a dish name the chat model
+made up) is answered locally instead of going upstream again. Time is split
+into generations, each with its own filter; a generation is dropped once it
+is older than the TTL, which is how entries expire without deletion.
+
+A Bloom filter can report a key it never saw. `false_positive_rate` bounds
+how often a key never added is reported at full capacity; a caller that
+trusts hits accepts that share of wrongly skipped lookups, each for at most
+the TTL.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Size the filter for a number of keys and false-positive rate.
+
+        Args:
+            capacity: Number of keys the filter is sized for.
+            error_rate: False-positive rate at `capacity` keys.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        """Add a key."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class NegativeCache:
+    """
+    Remembers keys of upstream misses for roughly `ttl` seconds.
+
+    Memory is bounded by `generations` filters sized for `capacity` keys
+    each. A key stays known for between ttl * (1 - 1/generations) and ttl
+    seconds; a generation that fills up before its time is over is closed
+    early, which can shorten that when misses arrive faster than
+    capacity / (ttl / generations) per second.
+    """
+
+    def __init__(self, ttl: float = 300.0, capacity: int = 100_000,
+                 error_rate: float = 0.01, generations: int = 3):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a miss is remembered.
+            capacity: Keys per generation.
+            error_rate: False-positive rate of each generation's filter.
+            generations: Number of filters the TTL is split across.
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.generations = generations
+        self.hits = 0
+        self._generation_span = ttl / generations
+        self._filters: Deque[Tuple[float, BloomFilter]] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._filters and now - self._filters[0][0] >= self.ttl:
+            self._filters.popleft()
+
+    def add(self, key: str) -> None:
+        """Remember that `key` found nothing upstream."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if (not self._filters or now - self._filters[-1][0] >= self._generation_span
+                    or self._filters[-1][1].count >= self.capacity):
+                self._filters.append((now, BloomFilter(self.capacity, self.error_rate)))
+                while len(self._filters) > self.generations:
+                    self._filters.popleft()
+            self._filters[-1][1].add(key)
+
+    def __contains__(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if any(key in bloom for _, bloom in self._filters):
+                self.hits += 1
+                return True
+            return False
+
+    def clear(self) -> None:
+        """Forget all misses."""
+        with self._lock:
+            self._filters.clear()
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Chance that a key never added is reported, with every generation full."""
+        return 1 - (1 - self.error_rate) ** self.generations
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory used by the filters' bit arrays."""
+        with self._lock:
+            return sum(bloom.size_bytes for _, bloom in self._filters)
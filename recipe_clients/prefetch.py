@@ -0,0 +1,311 @@
+# recipe_clients/prefetch.py
+"""Speculative recipe prefetching driven by a streaming chat response.
+
+The chat model's answer arrives token by token. `StreamingRecipePrefetcher`
+scans each completed line of the partial message for dish names (Markdown
+headings, bold list items outside a dish's own lists) and ingredient
+lists, and starts
+`RecipeService.search_recipes` calls for them on a small background pool
+while the rest of the message is still streaming. When the message is done,
+recipe cards look their queries up with `get` and usually find the results
+ready. Hits and prefetches that were never used are counted in
+`PrefetchStats`. Each search runs under its own Deadline, which `cancel`
+expires so that running searches stop at their next upstream call.
+"""
+
+import contextvars
+import logging
+import re
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .concurrency import PRIORITY_BACKGROUND, request_priority
+from .deadline import Deadline
+from .queries import canonical_query
+from .recipe_client_abc import Recipe
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Numbered headings ("## 1. Chicken Tikka") keep only the dish name
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(?:\d+[.)]\s*)?(?P<text>.+?)\s*#*\s*$")
+_BOLD_ITEM_RE = re.compile(r"^\s*(?:(?:\d+[.)]|[-*•])\s+)?\*\*(?P<text>[^*]+?)\*\*")
+_BULLET_RE = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+(?P<text>.+)$")
+_LEADING_QUANTITY_RE = re.compile(
+    r"^[\d\s/.,½⅓⅔¼¾⅛-]*(?:(?:cups?|tbsp|tsp|tablespoons?|teaspoons?|g|grams?|kg|ml|l|oz|ounces?|lbs?|pounds?|"
+    r"cloves?|cans?|pinch|handful|slices?|large|medium|small)\b\.?)?\s*(?:of\s+)?",
+    re.IGNORECASE,
+)
+_TRAILING_NOTE_RE = re.compile(r"\s*(?:\(.*\)|[,:–—-].*)$")
+
+# Headings that structure a recipe rather than name a dish
+SECTION_WORDS = {
+    "ingredients", "instructions", "directions", "method", "steps", "preparation", "notes",
+    "tips", "variations", "serving", "servings", "nutrition", "equipment", "summary",
+    "why you'll love it", "storage", "enjoy", "meal plan", "shopping list",
+}
+INGREDIENT_SECTION_WORDS = {"ingredients", "you'll need", "what you need", "shopping list"}
+# Headings over a list of dishes ("Dinner ideas", "Day 2") rather than one dish
+LIST_HEADING_WORDS = {
+    "ideas", "options", "suggestions", "recipes", "dishes", "menu", "meals", "day",
+    "breakfast", "lunch", "dinner", "snacks",
+}
+
+
+@dataclass
+class PrefetchStats:
+    """Counters describing how useful prefetching was."""
+    issued: int = 0  # Searches started
+    completed: int = 0  # Searches that finished with a result list
+    failed: int = 0
+    cancelled: int = 0  # Searches cancelled before they ran
+    hits: int = 0  # Lookups answered by a prefetched search
+    misses: int = 0  # Lookups for queries that were never prefetched
+    timeouts: int = 0  # Lookups that gave up waiting for a prefetched search
+    wasted: int = 0  # Searches that ran but whose results nobody used (spent quota)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered by prefetched searches."""
+        lookups = self.hits + self.misses + self.timeouts
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def waste_rate(self) -> float:
+        """Fraction of completed searches that were never used."""
+        return self.wasted / self.completed if self.completed else 0.0
+
+
+class StreamingRecipePrefetcher:
+    """
+    Detects dishes in a streaming chat message and prefetches their recipes.
+
+    Create one prefetcher per chat message. Pass a shared PrefetchStats and
+    executor to aggregate statistics and bound concurrency across messages.
+    """
+
+    SEARCH_TIMEOUT = 30.0  # Default seconds a prefetched search may take
+
+    def __init__(self, service: Any, filters: Optional[Dict[str, Any]] = None,
+                 max_prefetches: int = 6, executor: Optional[ThreadPoolExecutor] = None,
+                 stats: Optional[PrefetchStats] = None, search_timeout: float = SEARCH_TIMEOUT):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            service: The RecipeService (or anything with `search_recipes`).
+            filters: Filters passed with every prefetched search.
+            max_prefetches: Maximum searches started for one message.
+            executor: Pool to run searches on. A private single-thread pool,
+                      so prefetching never competes with more than one slot,
+                      is created if not provided.
+            stats: Statistics object to update; a new one if not provided.
+            search_timeout: Seconds each prefetched search may take.
+        """
+        self.service = service
+        self.filters = filters
+        self.max_prefetches = max_prefetches
+        self.stats = stats if stats is not None else PrefetchStats()
+        self.search_timeout = search_timeout
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="recipe-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._deadlines: Dict[str, Deadline] = {}
+        self._used: set = set()
+        self._buffer = ""
+        self._in_ingredients = False
+        self._in_section = False
+        self._in_dish = False  # Under a heading naming one dish, whose lists are its ingredients and steps
+        self._ingredients: List[str] = []
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Process the next piece of the streamed message.
+
+        Only complete lines are scanned; a partial last line is kept until the
+        next chunk (or `finish`) completes it.
+
+        Args:
+            chunk: Newly received text.
+
+        Returns:
+            Queries whose prefetch was started by this chunk.
+        """
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        started = []
+        for line in lines:
+            started.extend(self._scan_line(line))
+        return started
+
+    def finish(self) -> List[str]:
+        """
+        Mark the message as complete and scan any remaining partial line.
+
+        Returns:
+            Queries whose prefetch was started by the final line.
+        """
+        started = self._scan_line(self._buffer) if self._buffer else []
+        self._buffer = ""
+        started.extend(self._flush_ingredients())
+        return started
+
+    def get(self, query: str, timeout: Optional[float] = None) -> Optional[List[Recipe]]:
+        """
+        Get the prefetched results for a query.
+
+        Args:
+            query: The dish name or query the recipe card needs.
+            timeout: Seconds to wait if the search is still running. None waits
+                     until it finishes.
+
+        Returns:
+            The prefetched recipes, or None if the query was not prefetched or
+            its search failed or did not finish in time.
+        """
+        key = canonical_query(query)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                self.stats.misses += 1
+                return None
+            self._used.add(key)
+        try:
+            results = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.stats.timeouts += 1
+                self._used.discard(key)  # Unused unless a later lookup gets it
+            return None
+        except Exception:  # Cancelled, or the search itself failed
+            return None
+        with self._lock:
+            self.stats.hits += 1
+        return results
+
+    @property
+    def queries(self) -> List[str]:
+        """Canonical queries prefetched for this message, in order."""
+        return list(self._futures)
+
+    def cancel(self) -> None:
+        """
+        Cancel searches that have not started yet and stop running ones.
+
+        Running searches see their deadline pass and skip their remaining
+        upstream calls; a call already in flight still finishes.
+        """
+        self._cancelled.set()
+        with self._lock:
+            for future in self._futures.values():
+                # cancel() is also True for futures cancelled by an earlier call
+                if not future.done() and future.cancel():
+                    self.stats.cancelled += 1
+            for deadline in self._deadlines.values():
+                deadline.expire()
+
+    def close(self) -> None:
+        """
+        Cancel pending searches and count the ones that ran but were never used as wasted.
+
+        Searches still running are counted when they finish. Call once the
+        message's recipe cards have been rendered.
+        """
+        self.cancel()
+        with self._lock:
+            unused = [future for key, future in self._futures.items() if key not in self._used]
+        for future in unused:
+            future.add_done_callback(self._count_wasted)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    def _count_wasted(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self.stats.wasted += 1
+
+    def _scan_line(self, line: str) -> List[str]:
+        """Detect dish names and ingredient sections in one complete line."""
+        started = []
+        heading = _HEADING_RE.match(line)
+        bold = _BOLD_ITEM_RE.match(line)
+        title = heading.group("text") if heading else bold.group("text") if bold else None
+
+        if title is not None:
+            title = _TRAILING_NOTE_RE.sub("", title.replace("*", "")).strip()
+            lowered = canonical_query(title)
+            if any(word in lowered for word in INGREDIENT_SECTION_WORDS):
+                started.extend(self._flush_ingredients())
+                self._in_ingredients = True
+                return started
+            # A bold line that is not a list item ends an ingredient list like a heading does
+            ends_list = self._in_ingredients and not _BULLET_RE.match(line)
+            if heading or ends_list or not (self._in_ingredients or self._in_section or self._in_dish):
+                started.extend(self._flush_ingredients())
+                self._in_ingredients = False
+                # Bold items inside e.g. an Instructions section are not dishes
+                self._in_section = lowered in SECTION_WORDS
+                if heading and not self._in_section:
+                    list_heading = not LIST_HEADING_WORDS.isdisjoint(lowered.split())
+                    self._in_dish = not list_heading
+                    if list_heading:
+                        return started
+                elif self._in_dish:
+                    return started  # A sub-title of the dish, e.g. "**For the sauce**"
+                if lowered and not self._in_section and len(lowered) >= 3:
+                    started.extend(self._start(lowered))
+                return started
+
+        if self._in_ingredients:
+            bullet = _BULLET_RE.match(line)
+            if bullet:
+                name = _TRAILING_NOTE_RE.sub("", _LEADING_QUANTITY_RE.sub("", bullet.group("text")))
+                name = canonical_query(name.replace("*", ""))
+                if name:
+                    self._ingredients.append(name)
+            elif line.strip():
+                started.extend(self._flush_ingredients())
+                self._in_ingredients = False
+        return started
+
+    def _flush_ingredients(self) -> List[str]:
+        """Start a search for the ingredient list collected so far."""
+        ingredients, self._ingredients = self._ingredients, []
+        if len(ingredients) < 2:
+            return []
+        return self._start(", ".join(ingredients[:3]))
+
+    def _start(self, key: str) -> List[str]:
+        """Submit a prefetch search unless it is a duplicate or over the limit."""
+        with self._lock:
+            if self._cancelled.is_set() or key in self._futures or len(self._futures) >= self.max_prefetches:
+                return []
+            deadline = self._deadlines[key] = Deadline(self.search_timeout)
+            # Run in a copy of the caller's context so the search joins the chat request's trace
+            self._futures[key] = self._executor.submit(contextvars.copy_context().run, self._search, key, deadline)
+            self.stats.issued += 1
+        logger.debug(f"Prefetching recipes for '{key}'")
+        return [key]
+
+    def _search(self, query: str, deadline: Deadline) -> List[Recipe]:
+        if self._cancelled.is_set():
+            with self._lock:
+                self.stats.cancelled += 1
+            raise CancelledError()
+        try:
+            # Prefetches are speculative, so they queue behind interactive lookups
+            with request_priority(PRIORITY_BACKGROUND):
+                results = self.service.search_recipes(query, self.filters, deadline=deadline)
+        except Exception as e:
+            with self._lock:
+                self.stats.failed += 1
+            logger.warning(f"Prefetch search for '{query}' failed: {e}")
+            raise
+        with self._lock:
+            self.stats.completed += 1
+        return results
@@ -0,0 +1,147 @@
+# recipe_clients/provider_registry.py
+"""Registry mapping recipe ID prefixes to lazily constructed recipe clients."""
+
+import importlib
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .recipe_client_abc import RecipeClient
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Built-in providers: ID prefix -> (module within this package, adapter class)
+BUILTIN_PROVIDERS = {
+    "spoonacular": ("spoonacular_adapter", "SpoonacularAdapter"),
+    "themealdb": ("mealdb_adapter", "MealDBAdapter"),
+}
+
+
+def lazy_factory(module: str, class_name: str, **kwargs) -> Callable[[], RecipeClient]:
+    """
+    Build a factory that imports and constructs an adapter on first use.
+
+    Args:
+        module: Module name relative to this package (e.g. 'mealdb_adapter').
+        class_name: Name of the RecipeClient class in that module.
+        **kwargs: Keyword arguments passed to the class constructor.
+
+    Returns:
+        A zero-argument callable returning a new client instance.
+    """
+    def factory() -> RecipeClient:
+        adapter_class = getattr(importlib.import_module(f".{module}", __package__), class_name)
+        return adapter_class(**kwargs)
+    return factory
+
+
+class ProviderRegistry:
+    """
+    Maps recipe ID prefixes (e.g. 'spoonacular' in 'spoonacular_123') to clients.
+
+    Clients are registered either as instances or as factories; factories are
+    only called the first time their provider is needed, so adapters and
+    their HTTP/validation dependencies are not imported until then.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], RecipeClient]] = {}
+        self._instances: Dict[str, RecipeClient] = {}
+        self._lock = threading.Lock()
+
+    def register(self, prefix: str, factory: Callable[[], RecipeClient]) -> None:
+        """
+        Register a factory for a provider prefix.
+
+        Args:
+            prefix: The ID prefix, without the trailing underscore.
+            factory: Zero-argument callable constructing the client.
+        """
+        with self._lock:
+            self._factories[prefix] = factory
+            self._instances.pop(prefix, None)
+
+    def register_client(self, client: RecipeClient, prefix: Optional[str] = None) -> None:
+        """
+        Register an already constructed client.
+
+        Args:
+            client: The client instance.
+            prefix: The ID prefix; defaults to the client's `source_api`, or its
+                    lowercased class name if that is empty.
+        """
+        prefix = prefix or client.source_api or client.__class__.__name__.lower()
+        with self._lock:
+            self._factories[prefix] = lambda: client
+            self._instances[prefix] = client
+
+    def get(self, prefix: str) -> Optional[RecipeClient]:
+        """
+        Get the client for a prefix, constructing it if needed.
+
+        Args:
+            prefix: The ID prefix.
+
+        Returns:
+            The client, or None if no provider is registered for the prefix.
+        """
+        client = self._instances.get(prefix)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._instances.get(prefix)
+            if client is None:
+                factory = self._factories.get(prefix)
+                if factory is None:
+                    return None
+                client = factory()
+                self._instances[prefix] = client
+                logger.info(f"Initialized recipe provider '{prefix}' ({client.__class__.__name__})")
+            return client
+
+    def resolve(self, recipe_id: str) -> Optional[Tuple[str, RecipeClient]]:
+        """
+        Find the provider for a prefixed recipe ID.
+
+        Args:
+            recipe_id: The recipe ID with provider prefix (e.g. 'themealdb_52772').
+
+        Returns:
+            (prefix, client) tuple, or None if the ID has no registered prefix.
+        """
+        prefix, separator, _ = recipe_id.partition("_")
+        if not separator:
+            return None
+        client = self.get(prefix)
+        return (prefix, client) if client is not None else None
+
+    @property
+    def prefixes(self) -> List[str]:
+        """Registered prefixes in registration order."""
+        return list(self._factories)
+
+    def items(self) -> List[Tuple[str, RecipeClient]]:
+        """(prefix, client) pairs for every provider, constructing them if needed."""
+        return [(prefix, self.get(prefix)) for prefix in self.prefixes]
+
+    def __contains__(self, prefix: object) -> bool:
+        return prefix in self._factories
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+
+def builtin_factory(prefix: str, **kwargs) -> Callable[[], RecipeClient]:
+    """
+    Lazy factory for one of the built-in providers.
+
+    Args:
+        prefix: 'spoonacular' or 'themealdb'.
+        **kwargs: Keyword arguments passed to the adapter constructor.
+
+    Raises:
+        KeyError: If the prefix is not a built-in provider.
+    """
+    module, class_name = BUILTIN_PROVIDERS[prefix]
+    return lazy_factory(module, class_name, **kwargs)
@@ -0,0 +1,18 @@
+# recipe_clients/queries.py
+"""Normalization of search queries and dish names.
+
+The chat model names the same dish in many spellings ("Chicken Tikka
+Masala 🍛", "chicken tikka masala", "Chicken  Tikka-Masala!"). Batch search
+and prefetching both key their work on `canonical_query`, so spellings
+that differ only in case, punctuation, emoji or whitespace share one
+upstream search.
+"""
+
+import re
+
+_EMOJI_RE = re.compile(r"[^\w\s'&-]+", re.UNICODE)
+
+
+def canonical_query(text: str) -> str:
+    """Normalize a dish name or query so equivalent spellings share a key."""
+    return " ".join(_EMOJI_RE.sub(" ", text).lower().split())
@@ -3,7 +3,25 @@
 
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+
+from .deadline import Deadline
+
+
+class ProviderError(Exception):
+    """
+    Raised when a provider could not answer (network error, bad status,
+    unusable response), as opposed to answering with no results.
+    
+    Results are cached and empty ones remembered as misses, so a failure
+    must never look like an empty list or None. A search that failed only
+    in part carries the recipes it did get in `partial`; they can be shown
+    but must not be cached.
+    """
+
+    def __init__(self, message: str, partial: Optional[List["Recipe"]] = None):
+        super().__init__(message)
+        self.partial = partial or []
 
 
 @dataclass
@@ -34,32 +52,59 @@ class Recipe:
     dietary_tags: List[str] = field(default_factory=list)
 
 
+def recipe_to_dict(recipe: Recipe) -> Dict[str, Any]:
+    """Convert a Recipe to a plain dictionary of JSON-compatible values."""
+    return asdict(recipe)
+
+
+def recipe_from_dict(data: Dict[str, Any]) -> Recipe:
+    """Rebuild a Recipe from a dictionary produced by `recipe_to_dict`."""
+    fields = dict(data)
+    fields['ingredients'] = [RecipeIngredient(**ing) for ing in fields.get('ingredients', [])]
+    return Recipe(**fields)
+
+
 class RecipeClient(ABC):
     """Abstract base class for recipe clients to ensure consistent interface."""
     
+    # Provider name used as the recipe ID prefix (e.g. 'spoonacular' in 'spoonacular_123')
+    source_api: str = ""
+    
     @abstractmethod
-    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Recipe]:
+    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None) -> List[Recipe]:
         """
         Search for recipes by query string.
         
         Args:
             query: The search query (recipe name, ingredients, etc.)
             filters: Optional filters like cuisine, diet, etc.
+            deadline: Optional deadline; HTTP calls get only the remaining time
+                      and work that no longer fits is skipped.
             
         Returns:
-            List of standardized Recipe objects matching the query.
+            List of standardized Recipe objects matching the query; empty only
+            if the provider found nothing.
+            
+        Raises:
+            ProviderError: If the provider could not be searched.
         """
         pass
     
     @abstractmethod
-    def get_recipe_by_id(self, recipe_id: str) -> Optional[Recipe]:
+    def get_recipe_by_id(self, recipe_id: str, deadline: Optional[Deadline] = None) -> Optional[Recipe]:
         """
         Get detailed information for a specific recipe by ID.
         
         Args:
             recipe_id: The recipe ID in the source API format.
+            deadline: Optional deadline for the lookup.
             
         Returns:
-            Standardized Recipe object if found, None otherwise.
+            Standardized Recipe object if found, None if the provider has no
+            recipe with that ID.
+            
+        Raises:
+            ProviderError: If the lookup failed.
         """
         pass
@@ -1,39 +1,136 @@
 # recipe_clients/recipe_service.py
 """Unified service for accessing recipe data from different providers."""
 
+import contextvars
+import json
 import logging
 import os
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, List, Optional, Dict, Any, Union
 
-from .recipe_client_abc import RecipeClient, Recipe
-from .spoonacular_adapter import SpoonacularAdapter
+from .deadline import Deadline
+from .negative_cache import NegativeCache
+from .provider_registry import ProviderRegistry, builtin_factory
+from .queries import canonical_query
+from .recipe_client_abc import ProviderError, RecipeClient, Recipe, recipe_from_dict, recipe_to_dict
+from .recipe_store import RecipeStore
+from .shared_state import InMemorySharedState, SharedState, SQLiteSharedState
+from .tracing import request_trace, span
+
+if TYPE_CHECKING:  # Imported lazily at runtime to keep NumPy out of cold starts
+    from .filter_index import RecipeFilterIndex
+    from .meal_planner import MealPlan, PlanningIndex
+    from .similarity_index import SimilarityIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+@dataclass
+class BatchSearchResult:
+    """Results of RecipeService.search_many."""
+    results: Dict[str, List[Recipe]] = field(default_factory=dict)  # Original query -> recipes
+    merged: List[Recipe] = field(default_factory=list)  # All distinct recipes, sorted by name
+    canonical: Dict[str, str] = field(default_factory=dict)  # Original query -> canonical query
+    order: List[str] = field(default_factory=list)  # Canonical queries in the order they were started
+    incomplete: List[str] = field(default_factory=list)  # Canonical queries cut short by a fetch budget or quota
+
+
+class _FetchBudget:
+    """Provider fetches a search batch may still start, shared by its searches."""
+
+    def __init__(self, fetches: int):
+        self.remaining = fetches
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
 
 class RecipeService:
     """
     Service for accessing recipe data from different providers.
     Manages one or more recipe clients and combines results.
+    
+    Searches and lookups are traced per stage (see `tracing`). Call them
+    inside `tracing.request_trace(request_id)` to attach the spans to the
+    chat layer's request ID.
     """
+    CACHE_TTL = 3600  # Seconds a shared cache entry stays valid
+    LOCK_TTL = 30  # Seconds before an abandoned single-flight lock expires
+    LOCK_POLL_INTERVAL = 0.05  # Seconds between checks while another worker fetches
+    NEGATIVE_CACHE_TTL = 300  # Seconds an empty search or unknown recipe ID is remembered
+    NEGATIVE_CACHE_ERROR_RATE = 0.001  # False-positive rate of each negative cache generation
+    BATCH_CONCURRENCY = 4  # Searches run at once by search_many
     
-    def __init__(self, clients: Optional[List[RecipeClient]] = None):
+    def __init__(self, clients: Optional[List[RecipeClient]] = None,
+                 store: Optional[RecipeStore] = None,
+                 shared_state: Optional[SharedState] = None,
+                 quota_limits: Optional[Dict[str, int]] = None,
+                 cache_ttl: float = CACHE_TTL,
+                 registry: Optional[ProviderRegistry] = None,
+                 negative_cache: Optional[NegativeCache] = None):
         """
         Initialize with list of recipe clients.
         If none provided, defaults to SpoonacularAdapter only.
         
         Args:
-            clients: List of RecipeClient implementations to use.
+            clients: List of RecipeClient implementations to use. Each is
+                     registered under its `source_api` ID prefix.
+            store: Store that collects every recipe returned by the clients.
+                   A new empty store is created if not provided.
+            shared_state: Cache, lock and counter backend shared by all worker
+                          processes. If not provided and WHISKAI_SHARED_STATE_PATH
+                          is set, a SQLiteSharedState at that path is used.
+            quota_limits: Maximum upstream calls per UTC day, keyed by provider
+                          prefix (e.g. {'spoonacular': 150}).
+                          Counted across all workers sharing the state, or
+                          per process if there is no shared state.
+            cache_ttl: Seconds a shared cache entry stays valid.
+            registry: Provider registry to use instead of `clients`. Providers
+                      registered as factories are constructed on first use.
+            negative_cache: Memory of searches that found nothing and recipe IDs
+                            that do not exist, so repeats skip the upstream call.
+                            Its hits are trusted without a cache read, so a key
+                            it falsely reports (see NegativeCache.false_positive_rate)
+                            finds nothing until its generation expires. A
+                            NegativeCache with NEGATIVE_CACHE_TTL and
+                            NEGATIVE_CACHE_ERROR_RATE is created if not provided.
         """
-        self.clients = clients or []
+        if registry is None:
+            registry = ProviderRegistry()
+            for client in clients or []:
+                registry.register_client(client)
+        self.registry = registry
+        self.store = store if store is not None else RecipeStore()
+        if shared_state is None and os.environ.get("WHISKAI_SHARED_STATE_PATH"):
+            shared_state = SQLiteSharedState(os.environ["WHISKAI_SHARED_STATE_PATH"])
+        self.shared_state = shared_state
+        # Stands in for shared_state when there is none: quota counters
+        self._local_state = InMemorySharedState()
+        self.quota_limits = quota_limits or {}
+        self.cache_ttl = cache_ttl
+        if negative_cache is None:
+            negative_cache = NegativeCache(self.NEGATIVE_CACHE_TTL, error_rate=self.NEGATIVE_CACHE_ERROR_RATE)
+        self.negative_cache = negative_cache
+        self._filter_index = None
+        self._similarity_index = None
+        self._planning_index = None
         
         # If no clients specified, create default client (Spoonacular only)
-        if not self.clients:
+        if not len(self.registry):
             # Check for Spoonacular API key
             if os.environ.get("SPOONACULAR_API_KEY"):
                 logger.info("Using Spoonacular as the recipe provider")
-                self.clients.append(SpoonacularAdapter())
+                # Constructed lazily on first use
+                self.registry.register("spoonacular", builtin_factory("spoonacular"))
             else:
                 # Require Spoonacular API key - no fallback
                 raise ValueError(
@@ -41,8 +138,101 @@ class RecipeService:
                     "Please add SPOONACULAR_API_KEY to your .env file."
                 )
     
+    @property
+    def filter_index(self) -> "RecipeFilterIndex":
+        """Attribute index over the store, built on first use and kept up to date."""
+        if self._filter_index is None:
+            from .filter_index import RecipeFilterIndex
+            index = RecipeFilterIndex()
+            self.store.subscribe(index.add)
+            index.add_many(self.store)
+            self._filter_index = index
+        return self._filter_index
+    
+    def filter_cached_recipes(self, filters: Optional[Dict[str, Any]] = None) -> List[Recipe]:
+        """
+        Filter the recipes already in the store without any upstream calls.
+        
+        Args:
+            filters: Spoonacular-style filters (diet, cuisine, maxReadyTime, ...).
+            
+        Returns:
+            Cached recipes matching the filters.
+        """
+        return self.filter_index.query_filters(filters)
+    
+    @property
+    def similarity_index(self) -> "SimilarityIndex":
+        """Similarity index over the store, built on first use and kept up to date."""
+        if self._similarity_index is None:
+            from .similarity_index import SimilarityIndex
+            index = SimilarityIndex()
+            self.store.subscribe(index.add)
+            index.add_many(self.store)
+            self._similarity_index = index
+        return self._similarity_index
+    
+    def similar_recipes(self, recipe_id: str, k: int = 5) -> List[Recipe]:
+        """
+        Find cached recipes similar to a recipe, without upstream calls.
+        
+        Args:
+            recipe_id: The prefixed ID of a recipe in the store.
+            k: Maximum number of results.
+            
+        Returns:
+            Up to k similar recipes, most similar first.
+        """
+        recipe = self.store.get(recipe_id)
+        if recipe is None:
+            logger.warning(f"Recipe '{recipe_id}' is not in the store; no similar recipes")
+            return []
+        return [similar for similar, _ in self.similarity_index.similar(recipe, k)]
+    
+    @property
+    def planning_index(self) -> "PlanningIndex":
+        """Ingredient arrays the meal planner scores with, built on first use and kept up to date."""
+        if self._planning_index is None:
+            from .meal_planner import PlanningIndex
+            index = PlanningIndex()
+            self.store.subscribe(index.add)
+            index.add_many(self.store)
+            self._planning_index = index
+        return self._planning_index
+    
+    def plan_meals(self, days: int = 7, meals_per_day: int = 1,
+                   filters: Optional[Dict[str, Any]] = None,
+                   max_total_time: Optional[int] = None,
+                   exclude_ids: Optional[List[str]] = None) -> "MealPlan":
+        """
+        Generate a meal plan from the recipes already in the store.
+        
+        No upstream calls are made; search first to widen the candidate pool.
+        
+        Args:
+            days: Number of days to plan.
+            meals_per_day: Meals per day.
+            filters: Spoonacular-style filters every planned recipe must satisfy.
+            max_total_time: Budget in minutes for all planned meals together.
+            exclude_ids: Recipe IDs that must not be planned.
+            
+        Returns:
+            The generated MealPlan.
+        """
+        from .meal_planner import MealPlanner
+        return MealPlanner().plan(
+            [], days, meals_per_day, filters, max_total_time, exclude_ids,
+            index=self.filter_index, planning_index=self.planning_index
+        )
+    
+    @property
+    def clients(self) -> List[RecipeClient]:
+        """All registered clients, constructing any that are still lazy."""
+        return [client for _, client in self.registry.items()]
+    
     def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
-                       limit: int = 20) -> List[Recipe]:
+                       limit: int = 20,
+                       deadline: Union[Deadline, float, None] = None) -> List[Recipe]:
         """
         Search for recipes across all available clients.
         
@@ -50,57 +240,289 @@ class RecipeService:
             query: The search query (recipe name, ingredients, etc.)
             filters: Optional filters like cuisine, diet, etc.
             limit: Maximum number of results to return (per provider)
+            deadline: Optional Deadline (or budget in seconds) for the whole
+                      search. Providers and lookups that no longer fit are
+                      skipped and recorded on the Deadline, whose `partial`
+                      flag then marks the results as incomplete.
             
         Returns:
             Combined list of standardized Recipe objects from all providers.
         """
-        all_results = []
+        deadline = Deadline.coerce(deadline)
+        with request_trace():
+            return self._search(query, filters, limit, deadline)
+    
+    def search_many(self, queries: List[str], filters: Optional[Dict[str, Any]] = None,
+                    limit: int = 20,
+                    deadline: Union[Deadline, float, None] = None,
+                    max_concurrency: Optional[int] = None,
+                    max_provider_fetches: Optional[int] = None) -> "BatchSearchResult":
+        """
+        Run several searches as one batch.
         
-        for client in self.clients:
-            try:
-                client_name = client.__class__.__name__
-                logger.info(f"Searching for recipes with {client_name}: '{query}'")
-                results = client.search_recipes(query, filters)
-                logger.info(f"Found {len(results)} results from {client_name}")
-                all_results.extend(results)
-            except Exception as e:
-                logger.error(f"Error searching with {client.__class__.__name__}: {e}")
+        Queries are canonicalized (case, punctuation, whitespace) and each
+        distinct query is searched once. The searches run concurrently, so the
+        batch takes about as long as its slowest query. Queries sharing words
+        with other queries in the batch start first.
         
-        # Sort by name (could add other sorting options)
-        all_results.sort(key=lambda r: r.name)
+        Args:
+            queries: The search queries, e.g. one per dish the chat model suggested.
+            filters: Filters applied to every query.
+            limit: Maximum number of results per query.
+            deadline: Optional Deadline (or budget in seconds) for the whole batch.
+            max_concurrency: Maximum searches running at once; BATCH_CONCURRENCY
+                             if not provided.
+            max_provider_fetches: Optional cap on provider fetches for the whole
+                                  batch, on top of the daily provider quotas. A
+                                  fetch is one provider's search for one query
+                                  that missed the cache, however many HTTP
+                                  requests it makes: a TheMealDB search is one
+                                  search request plus a lookup per result. Cached
+                                  and known-empty queries do not use it.
+            
+        Returns:
+            A BatchSearchResult with per-query results and a merged view.
+        """
+        deadline = Deadline.coerce(deadline)
+        canonical = {query: canonical_query(query) for query in queries}
+        unique = list(dict.fromkeys(c for c in canonical.values() if c))
         
-        # Limit results if needed
-        return all_results[:limit]
+        # Queries sharing words with the rest of the batch go first
+        words = {q: {w for w in q.split() if len(w) > 2} for q in unique}
+        shared = {q: sum(len(words[q] & words[other]) for other in unique if other != q) for q in unique}
+        order = sorted(unique, key=lambda q: -shared[q])
+        
+        budget = _FetchBudget(max_provider_fetches) if max_provider_fetches is not None else None
+        denied: Dict[str, List[str]] = {q: [] for q in order}
+        by_canonical: Dict[str, List[Recipe]] = {}
+        with request_trace(), span("search_many", queries=len(queries), unique=len(unique)):
+            if order:
+                workers = max(1, min(max_concurrency or self.BATCH_CONCURRENCY, len(order)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recipe-batch") as executor:
+                    # Each search runs in a copy of this context so its spans join the batch's trace
+                    futures = {
+                        q: executor.submit(contextvars.copy_context().run, self._search,
+                                           q, filters, limit, deadline, budget, denied[q])
+                        for q in order
+                    }
+                    for q, future in futures.items():
+                        try:
+                            by_canonical[q] = future.result()
+                        except Exception as e:
+                            logger.error(f"Batch search for '{q}' failed: {e}")
+                            by_canonical[q] = []
+            
+            merged: Dict[str, Recipe] = {}
+            for q in order:
+                for recipe in by_canonical[q]:
+                    merged.setdefault(recipe.id, recipe)
+        
+        return BatchSearchResult(
+            results={query: by_canonical.get(c, []) for query, c in canonical.items()},
+            merged=sorted(merged.values(), key=lambda r: r.name),
+            canonical=canonical,
+            order=order,
+            incomplete=[q for q in order if denied[q]],
+        )
+    
+    def _search(self, query: str, filters: Optional[Dict[str, Any]], limit: int,
+                deadline: Optional[Deadline], budget: Optional["_FetchBudget"] = None,
+                denied: Optional[List[str]] = None) -> List[Recipe]:
+        """Search every provider for one query and merge the results."""
+        all_results = []
+        
+        with span("search_recipes", query=query, limit=limit):
+            for provider, client in self.registry.items():
+                if deadline is not None and deadline.expired:
+                    deadline.mark_skipped(f"{provider} search '{query}'")
+                    continue
+                try:
+                    client_name = client.__class__.__name__
+                    logger.info(f"Searching for recipes with {client_name}: '{query}'")
+                    cache_key = "search:{}:{}:{}".format(
+                        provider, query.strip().lower(), json.dumps(filters or {}, sort_keys=True)
+                    )
+                    with span("provider", provider=provider) as provider_span:
+                        results = self._fetch_shared(
+                            provider, cache_key, lambda: client.search_recipes(query, filters, deadline=deadline),
+                            deadline, budget, denied
+                        )
+                        provider_span.set_attribute("count", len(results))
+                    logger.info(f"Found {len(results)} results from {client_name}")
+                    self.store.add_many(results)
+                    all_results.extend(results)
+                except ProviderError as e:
+                    # Recipes from a partly failed search are used but never cached
+                    logger.warning(f"{client.__class__.__name__} search failed: {e}")
+                    self.store.add_many(e.partial)
+                    all_results.extend(e.partial)
+                except Exception as e:
+                    logger.error(f"Error searching with {client.__class__.__name__}: {e}")
+            
+            with span("merge", count=len(all_results)):
+                # Sort by name (could add other sorting options)
+                all_results.sort(key=lambda r: r.name)
+                
+                # Limit results if needed
+                return all_results[:limit]
     
-    def get_recipe_by_id(self, recipe_id: str) -> Optional[Recipe]:
+    def get_recipe_by_id(self, recipe_id: str,
+                         deadline: Union[Deadline, float, None] = None) -> Optional[Recipe]:
         """
         Get recipe details by ID from the appropriate client.
         Recipe IDs should be prefixed with the provider name (e.g., 'spoonacular_123').
         
         Args:
             recipe_id: The recipe ID with provider prefix.
+            deadline: Optional Deadline (or budget in seconds) for the lookup.
             
         Returns:
             Standardized Recipe object if found, None otherwise.
         """
-        # Determine which client to use based on ID prefix
-        if recipe_id.startswith("spoonacular_"):
-            for client in self.clients:
-                if isinstance(client, SpoonacularAdapter):
-                    return client.get_recipe_by_id(recipe_id)
-        elif recipe_id.startswith("themealdb_"):
-            for client in self.clients:
-                if isinstance(client, MealDBAdapter):
-                    return client.get_recipe_by_id(recipe_id)
-        
-        # If no provider prefix or no matching client, try all clients
-        logger.warning(f"No provider prefix in recipe ID '{recipe_id}' or no matching client, trying all clients")
-        for client in self.clients:
-            try:
-                recipe = client.get_recipe_by_id(recipe_id)
-                if recipe:
-                    return recipe
-            except Exception as e:
-                logger.error(f"Error getting recipe with {client.__class__.__name__}: {e}")
+        # Dispatch on the ID prefix; IDs without a registered prefix are not
+        # sent to every provider, since no provider could resolve them
+        resolved = self.registry.resolve(recipe_id)
+        if resolved is None:
+            logger.warning(f"No provider registered for recipe ID '{recipe_id}'")
+            return None
         
-        return None
+        provider, client = resolved
+        try:
+            with request_trace(), span("get_recipe_by_id", recipe_id=recipe_id, provider=provider):
+                return self._remember(self._fetch_recipe(provider, client, recipe_id, Deadline.coerce(deadline)))
+        except Exception as e:
+            logger.error(f"Error getting recipe with {client.__class__.__name__}: {e}")
+            return None
+
+    def _remember(self, recipe: Optional[Recipe]) -> Optional[Recipe]:
+        """Add a fetched recipe to the store and pass it through."""
+        if recipe:
+            self.store.add(recipe)
+        return recipe
+
+    def _fetch_recipe(self, provider: str, client: RecipeClient, recipe_id: str,
+                      deadline: Optional[Deadline] = None) -> Optional[Recipe]:
+        """Get a single recipe from a client through the shared cache."""
+        results = self._fetch_shared(
+            provider, f"recipe:{recipe_id}",
+            lambda: [recipe for recipe in [client.get_recipe_by_id(recipe_id, deadline=deadline)] if recipe],
+            deadline
+        )
+        return results[0] if results else None
+
+    def _fetch_shared(self, provider: str, key: str,
+                      fetch: Callable[[], List[Recipe]],
+                      deadline: Optional[Deadline] = None,
+                      budget: Optional[_FetchBudget] = None,
+                      denied: Optional[List[str]] = None) -> List[Recipe]:
+        """
+        Run an upstream fetch through the shared cache.
+
+        Only one worker fetches a given key at a time; the others wait for its
+        result to appear in the cache. Each upstream call counts against the
+        provider's daily quota. Empty results are remembered in the negative
+        cache, whose fixed-size Bloom filters answer repeated misses in this
+        process without a cache read or an upstream call. With shared state
+        they are also cached for at most NEGATIVE_CACHE_TTL, so other workers
+        learn of them. Failed fetches raise ProviderError and are not cached
+        at all.
+
+        Args:
+            provider: Provider name used for quota accounting.
+            key: Cache key identifying the request.
+            fetch: Callable performing the upstream request.
+            deadline: Optional deadline bounding the wait for another worker.
+                      Results cut short by the deadline are not cached.
+            budget: Optional fetch budget of a search batch; one fetch is taken
+                    before going upstream.
+            denied: List to append `key` to when the budget or the daily quota
+                    prevents the upstream call.
+
+        Returns:
+            The cached or freshly fetched recipes.
+
+        Raises:
+            ProviderError: If the upstream fetch failed.
+        """
+        if key in self.negative_cache:
+            logger.debug(f"Negative cache hit for '{key}'")
+            return []
+
+        if self.shared_state is None:
+            if (budget is not None and not budget.take()) or not self._consume_quota(provider):
+                if denied is not None:
+                    denied.append(key)
+                return []
+            skipped_before = len(deadline.skipped) if deadline is not None else 0
+            results = fetch()
+            if not results and (deadline is None or len(deadline.skipped) == skipped_before):
+                self.negative_cache.add(key)
+            return results
+
+        cached = self._read_cache(key)
+        if cached is not None:
+            if not cached:
+                self.negative_cache.add(key)
+            return cached
+
+        lock_key = "lock:" + key
+        token = self.shared_state.acquire_lock(lock_key, self.LOCK_TTL)
+        if token is None:
+            # Another worker is fetching the same key; wait for its result
+            wait = self.LOCK_TTL if deadline is None else min(self.LOCK_TTL, deadline.remaining())
+            wait_until = time.monotonic() + wait
+            while time.monotonic() < wait_until:
+                time.sleep(self.LOCK_POLL_INTERVAL)
+                cached = self._read_cache(key)
+                if cached is not None:
+                    return cached
+                token = self.shared_state.acquire_lock(lock_key, self.LOCK_TTL)
+                if token is not None:
+                    break
+            else:
+                logger.warning(f"Timed out waiting for another worker to fetch '{key}'")
+
+        try:
+            cached = self._read_cache(key)
+            if cached is not None:
+                return cached
+            if (budget is not None and not budget.take()) or not self._consume_quota(provider):
+                if denied is not None:
+                    denied.append(key)
+                return []
+            skipped_before = len(deadline.skipped) if deadline is not None else 0
+            results = fetch()
+            if deadline is not None and len(deadline.skipped) > skipped_before:
+                return results  # Partial results must not be served to other requests
+            if not results:
+                self.negative_cache.add(key)
+            ttl = self.cache_ttl if results else min(self.cache_ttl, self.negative_cache.ttl)
+            self.shared_state.set(
+                key, json.dumps([recipe_to_dict(r) for r in results]).encode("utf-8"), ttl
+            )
+            return results
+        finally:
+            if token is not None:
+                self.shared_state.release_lock(lock_key, token)
+
+    def _read_cache(self, key: str) -> Optional[List[Recipe]]:
+        """Decode cached recipes for a key from the shared state, or return None on a miss."""
+        with span("cache", key=key) as cache_span:
+            raw = self.shared_state.get(key)
+            cache_span.set_attribute("hit", raw is not None)
+            if raw is None:
+                return None
+            return [recipe_from_dict(data) for data in json.loads(raw)]
+
+    def _consume_quota(self, provider: str) -> bool:
+        """Count one upstream call; returns False if the daily quota is used up."""
+        limit = self.quota_limits.get(provider)
+        if limit is None:
+            return True
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        state = self.shared_state if self.shared_state is not None else self._local_state
+        used = state.incr(f"quota:{provider}:{day}", ttl=86400)
+        if used > limit:
+            logger.warning(f"Daily quota of {limit} calls for {provider} exhausted; skipping upstream call")
+            return False
+        return True
@@ -0,0 +1,92 @@
+# recipe_clients/recipe_store.py
+"""In-memory store of every standardized recipe seen by the service."""
+
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .recipe_client_abc import Recipe
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RecipeStore:
+    """
+    Keeps standardized Recipe objects keyed by their prefixed ID.
+
+    Recipes keep their insertion order, so bulk exports and index rebuilds
+    are deterministic. Listeners registered with `subscribe` are called with
+    every recipe that is added for the first time.
+    """
+
+    def __init__(self, recipes: Optional[Iterable[Recipe]] = None):
+        """
+        Initialize the store, optionally pre-populated with recipes.
+
+        Args:
+            recipes: Recipes to add to the store.
+        """
+        self._recipes: Dict[str, Recipe] = {}
+        self._listeners: List[Callable[[Recipe], None]] = []
+        self._lock = threading.RLock()
+        if recipes:
+            self.add_many(recipes)
+
+    def add(self, recipe: Recipe) -> bool:
+        """
+        Add or replace a recipe.
+
+        Args:
+            recipe: The recipe to store.
+
+        Returns:
+            True if the recipe ID was not in the store before, False otherwise.
+        """
+        with self._lock:
+            is_new = recipe.id not in self._recipes
+            self._recipes[recipe.id] = recipe
+            listeners = list(self._listeners) if is_new else []
+
+        for listener in listeners:
+            try:
+                listener(recipe)
+            except Exception as e:
+                logger.error(f"Recipe store listener failed for '{recipe.id}': {e}")
+        return is_new
+
+    def add_many(self, recipes: Iterable[Recipe]) -> int:
+        """
+        Add several recipes.
+
+        Args:
+            recipes: The recipes to store.
+
+        Returns:
+            The number of recipes that were new to the store.
+        """
+        return sum(1 for recipe in recipes if self.add(recipe))
+
+    def get(self, recipe_id: str) -> Optional[Recipe]:
+        """Return the recipe with the given prefixed ID, or None."""
+        return self._recipes.get(recipe_id)
+
+    def subscribe(self, listener: Callable[[Recipe], None]) -> None:
+        """
+        Register a callback invoked for each newly added recipe.
+
+        Args:
+            listener: Callable receiving the new Recipe.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def __contains__(self, recipe_id: object) -> bool:
+        return recipe_id in self._recipes
+
+    def __iter__(self) -> Iterator[Recipe]:
+        with self._lock:
+            return iter(list(self._recipes.values()))
+
+    def __len__(self) -> int:
+        return len(self._recipes)
@@ -0,0 +1,273 @@
+# recipe_clients/shared_state.py
+"""Shared cache, lock and counter state for RecipeService worker processes.
+
+When RecipeService runs in several worker processes (e.g. gunicorn), state
+kept in one process is invisible to the others. `SQLiteSharedState` keeps
+cache entries, single-flight locks and quota counters in one SQLite
+database in WAL mode, so every worker on the host reads and updates the
+same state without an external service.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SharedState(ABC):
+    """Key-value state shared between RecipeService instances."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The stored bytes, or None if missing or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Store a value for `ttl` seconds.
+
+        Args:
+            key: The cache key.
+            value: The bytes to store.
+            ttl: Time to live in seconds.
+        """
+        pass
+
+    @abstractmethod
+    def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """
+        Try to take a named lock without blocking.
+
+        Locks expire after `ttl` seconds, so a crashed holder cannot block
+        other workers forever.
+
+        Args:
+            key: The lock name.
+            ttl: Lease duration in seconds.
+
+        Returns:
+            An owner token if the lock was acquired, None otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def release_lock(self, key: str, token: str) -> None:
+        """
+        Release a lock previously acquired with `acquire_lock`.
+
+        Args:
+            key: The lock name.
+            token: The owner token returned by `acquire_lock`.
+        """
+        pass
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """
+        Atomically increment a counter.
+
+        Args:
+            key: The counter name.
+            amount: Amount to add.
+            ttl: If given, the counter resets to zero this many seconds after
+                 it was first incremented.
+
+        Returns:
+            The counter value after the increment.
+        """
+        pass
+
+
+class InMemorySharedState(SharedState):
+    """SharedState for a single process; state is shared between threads only."""
+
+    PURGE_INTERVAL = 500  # Writes between sweeps of expired values
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[bytes, float]] = {}
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._counters: Dict[str, Tuple[int, float]] = {}
+        self._writes = 0
+        self._mutex = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._mutex:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._values[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._mutex:
+            self._values[key] = (value, now + ttl)
+            self._writes += 1
+            if self._writes % self.PURGE_INTERVAL == 0:
+                # Expired values are otherwise only dropped when read again
+                self._values = {k: v for k, v in self._values.items() if v[1] > now}
+
+    def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        now = time.time()
+        with self._mutex:
+            holder = self._locks.get(key)
+            if holder is not None and holder[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, now + ttl)
+            return token
+
+    def release_lock(self, key: str, token: str) -> None:
+        with self._mutex:
+            holder = self._locks.get(key)
+            if holder is not None and holder[0] == token:
+                del self._locks[key]
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        with self._mutex:
+            value, expires_at = self._counters.get(key, (0, float('inf')))
+            if expires_at <= now:
+                value, expires_at = 0, float('inf')
+            if value == 0 and ttl is not None:
+                expires_at = now + ttl
+            value += amount
+            self._counters[key] = (value, expires_at)
+            return value
+
+
+class SQLiteSharedState(SharedState):
+    """
+    SharedState backed by a SQLite database in WAL mode.
+
+    Every process and thread opens its own connection to the same file, so
+    the database can be shared by all workers on one host. WAL mode lets
+    readers proceed while another worker writes.
+    """
+
+    BUSY_TIMEOUT_MS = 5000  # How long a writer waits for the database lock
+    PURGE_INTERVAL = 500  # Writes between sweeps of expired rows
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the shared state database.
+
+        Args:
+            path: Path of the SQLite database file.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS locks (
+                key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS counters (
+                key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL);
+        """)
+        logger.info(f"SQLiteSharedState initialized at {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection for the current thread, reopening after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT_MS / 1000,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write(self, statements) -> List[Tuple]:
+        """Run statements in one IMMEDIATE transaction; returns the rows of the last statement."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = None
+            for sql, params in statements:
+                cursor = conn.execute(sql, params)
+            result = cursor.fetchall() if cursor is not None else []
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._writes += 1
+        if self._writes % self.PURGE_INTERVAL == 0:
+            self.purge_expired()
+        return result
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._write([(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, sqlite3.Binary(value), time.time() + ttl),
+        )])
+
+    def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        now = time.time()
+        token = uuid.uuid4().hex
+        rows = self._write([
+            ("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now)),
+            ("INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+             (key, token, now + ttl)),
+            ("SELECT owner FROM locks WHERE key = ?", (key,)),
+        ])
+        return token if rows and rows[0][0] == token else None
+
+    def release_lock(self, key: str, token: str) -> None:
+        self._write([("DELETE FROM locks WHERE key = ? AND owner = ?", (key, token))])
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        rows = self._write([
+            ("DELETE FROM counters WHERE key = ? AND expires_at <= ?", (key, now)),
+            ("INSERT OR IGNORE INTO counters (key, value, expires_at) VALUES (?, 0, ?)",
+             (key, now + ttl if ttl is not None else None)),
+            ("UPDATE counters SET value = value + ? WHERE key = ?", (amount, key)),
+            ("SELECT value FROM counters WHERE key = ?", (key,)),
+        ])
+        return rows[0][0]
+
+    def purge_expired(self) -> None:
+        """Delete expired cache entries, locks and counters."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,227 @@
+# recipe_clients/shopping_list.py
+"""Aggregate ingredients from many recipes into one shopping list.
+
+Each recipe's ingredients are parsed once into NumPy arrays (ingredient
+index, unit index, base quantity) and cached by recipe ID, together with
+the ingredients they were parsed from so that an updated recipe is parsed
+again. Aggregating a
+meal plan then only concatenates the cached arrays and sums them per
+(ingredient, unit) with a single `np.bincount`, so the list can be
+recomputed on every edit of the plan.
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .measures import normalize_unit, parse_measure, to_base_unit
+from .recipe_client_abc import Recipe, RecipeIngredient
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=65536)
+def canonical_ingredient_name(name: str) -> str:
+    """
+    Normalize an ingredient name so the same item from different recipes matches.
+
+    Lowercases, strips punctuation and reduces simple plurals
+    ('Tomatoes' -> 'tomato', 'eggs' -> 'egg').
+
+    Args:
+        name: The ingredient name.
+
+    Returns:
+        The canonical ingredient name.
+    """
+    text = _SPACES_RE.sub(" ", _NON_WORD_RE.sub(" ", name.lower())).strip()
+    words = text.split(" ")
+    last = words[-1]
+    if len(last) > 4 and last.endswith("oes"):
+        last = last[:-2]
+    elif len(last) > 4 and last.endswith("ies"):
+        last = last[:-3] + "y"
+    elif len(last) > 3 and last.endswith("s") and not last.endswith(("ss", "us", "is")):
+        last = last[:-1]
+    words[-1] = last
+    return " ".join(words)
+
+
+@dataclass
+class ShoppingListItem:
+    """One line of an aggregated shopping list."""
+    name: str
+    quantity: Optional[float] = None  # None if no recipe gave a usable amount
+    unit: Optional[str] = None  # 'g', 'ml', a count unit, or None for plain counts
+    recipe_ids: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)  # Original text of unmeasured entries
+
+
+class ShoppingListAggregator:
+    """
+    Sums ingredient quantities per canonical ingredient across recipes.
+
+    Mass and volume units are converted to grams and millilitres before
+    summing; count-like units are only summed with the same unit. Parsed
+    recipes are cached (the `PARSED_CACHE_SIZE` most recently used), so
+    repeated aggregation over an edited plan only parses recipes that were
+    not seen before or whose ingredients changed.
+    """
+
+    UNMEASURED = ""  # Unit key for entries without a usable amount
+    PARSED_CACHE_SIZE = 4096  # Parsed recipes kept
+
+    def __init__(self):
+        self._names: Dict[str, int] = {}
+        self._name_list: List[str] = []
+        self._units: Dict[str, int] = {}
+        self._unit_list: List[str] = []
+        # recipe ID -> (ingredients they were parsed from, parsed arrays), least recently used first
+        self._parsed: "OrderedDict[str, Tuple[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unit_index(self.UNMEASURED)
+
+    def _name_index(self, name: str) -> int:
+        index = self._names.get(name)
+        if index is None:
+            index = self._names[name] = len(self._name_list)
+            self._name_list.append(name)
+        return index
+
+    def _unit_index(self, unit: str) -> int:
+        index = self._units.get(unit)
+        if index is None:
+            index = self._units[unit] = len(self._unit_list)
+            self._unit_list.append(unit)
+        return index
+
+    @staticmethod
+    def _measure(ing: RecipeIngredient) -> Tuple[Optional[float], Optional[str]]:
+        """Amount and canonical unit of an ingredient, parsing the text if needed."""
+        if ing.amount is not None:
+            unit = normalize_unit(ing.unit)
+            if unit is None and ing.unit and ing.unit.strip():
+                unit = ing.unit.strip().lower()  # Unknown unit: sum only with itself
+            return ing.amount, unit
+        text = ing.original_text or ""
+        prefix = f"{ing.name} - "
+        if text.startswith(prefix):
+            text = text[len(prefix):]  # TheMealDB's "{name} - {measure}"
+        parsed = parse_measure(text)
+        return parsed.amount, parsed.unit
+
+    def _parse(self, recipe: Recipe) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """Parse a recipe's ingredients into (name idx, unit idx, quantity, original text)."""
+        signature = tuple((ing.name, ing.amount, ing.unit, ing.original_text) for ing in recipe.ingredients)
+        names, units, quantities, texts = [], [], [], []
+        with self._lock:
+            cached = self._parsed.get(recipe.id)
+            if cached is not None and cached[0] == signature:
+                self._parsed.move_to_end(recipe.id)
+                return cached[1]
+            for ing in recipe.ingredients:
+                amount, unit = self._measure(ing)
+                if amount is None:
+                    unit_key, quantity = self.UNMEASURED, 0.0
+                else:
+                    quantity, base_unit = to_base_unit(amount, unit)
+                    unit_key = base_unit or "count"
+                names.append(self._name_index(canonical_ingredient_name(ing.name)))
+                units.append(self._unit_index(unit_key))
+                quantities.append(quantity)
+                texts.append(ing.original_text or ing.name)
+
+        parsed = (
+            np.asarray(names, dtype=np.int64),
+            np.asarray(units, dtype=np.int64),
+            np.asarray(quantities, dtype=np.float64),
+            texts,
+        )
+        with self._lock:
+            self._parsed[recipe.id] = (signature, parsed)
+            self._parsed.move_to_end(recipe.id)
+            while len(self._parsed) > self.PARSED_CACHE_SIZE:
+                self._parsed.popitem(last=False)
+        return parsed
+
+    def aggregate(self, recipes: Iterable[Recipe],
+                  scale: Optional[Dict[str, float]] = None) -> List[ShoppingListItem]:
+        """
+        Build a shopping list for a set of recipes.
+
+        Args:
+            recipes: The recipes in the plan. A recipe listed twice counts twice.
+            scale: Optional multiplier per recipe ID (e.g. servings wanted divided
+                   by the recipe's servings). Defaults to 1.
+
+        Returns:
+            Shopping list items sorted by ingredient name.
+        """
+        recipes = list(recipes)
+        if not recipes:
+            return []
+        scale = scale or {}
+
+        parsed = [self._parse(recipe) for recipe in recipes]
+        counts = [len(p[0]) for p in parsed]
+        names = np.concatenate([p[0] for p in parsed])
+        units = np.concatenate([p[1] for p in parsed])
+        quantities = np.concatenate([p[2] for p in parsed])
+        quantities = quantities * np.repeat(
+            np.asarray([scale.get(recipe.id, 1.0) for recipe in recipes], dtype=np.float64), counts
+        )
+        recipe_positions = np.repeat(np.arange(len(recipes)), counts)
+
+        # Sum quantities per (ingredient, unit) pair in one pass
+        n_units = len(self._unit_list)
+        keys = names * n_units + units
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=quantities, minlength=len(unique_keys))
+
+        texts = [text for p in parsed for text in p[3]]
+        items: Dict[int, ShoppingListItem] = {}
+        for row, key_index in enumerate(inverse.tolist()):
+            item = items.get(key_index)
+            if item is None:
+                key = int(unique_keys[key_index])
+                unit = self._unit_list[key % n_units]
+                item = items[key_index] = ShoppingListItem(
+                    name=self._name_list[key // n_units],
+                    quantity=None if unit == self.UNMEASURED else float(totals[key_index]),
+                    unit=None if unit in (self.UNMEASURED, "count") else unit,
+                )
+            recipe_id = recipes[recipe_positions[row]].id
+            if recipe_id not in item.recipe_ids:
+                item.recipe_ids.append(recipe_id)
+            if item.quantity is None:
+                item.notes.append(texts[row])
+
+        return sorted(items.values(), key=lambda item: (item.name, item.unit or ""))
+
+
+def aggregate_shopping_list(recipes: Iterable[Recipe],
+                            scale: Optional[Dict[str, float]] = None) -> List[ShoppingListItem]:
+    """
+    Build a shopping list with a fresh aggregator.
+
+    Use a long-lived ShoppingListAggregator instead when the same recipes are
+    aggregated repeatedly, so their parsed ingredients are reused.
+
+    Args:
+        recipes: The recipes in the plan.
+        scale: Optional multiplier per recipe ID.
+
+    Returns:
+        Shopping list items sorted by ingredient name.
+    """
+    return ShoppingListAggregator().aggregate(recipes, scale)
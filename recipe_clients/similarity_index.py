@@ -0,0 +1,230 @@
+# recipe_clients/similarity_index.py
+"""'More like this' recipe similarity over locally cached recipes.
+
+Every recipe is a TF-IDF vector over its canonical ingredient names and
+its cuisine/dietary tags. The index stores the sparse vectors as one
+posting list (array of recipe rows) per term, which can be appended to as
+new recipes arrive. A batch of queries is answered by gathering the
+postings of the terms the queries use into a small dense float32 block
+(recipes x query terms) and multiplying it with the query matrix, followed
+by a top-k `argpartition` per query.
+"""
+
+import logging
+import math
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .filter_index import normalize_tag
+from .recipe_client_abc import Recipe
+from .shopping_list import canonical_ingredient_name
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SimilarResult = List[Tuple[Recipe, float]]
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity index over TF-IDF weighted ingredient and tag vectors.
+
+    IDF weights and vector norms are refreshed whenever the corpus has grown
+    by more than `REFRESH_FRACTION` since the last refresh; in between, new
+    recipes use the IDF weights current when they were added.
+    """
+
+    REFRESH_FRACTION = 0.01
+    MAX_BLOCK_CELLS = 8_000_000  # Cap on the dense (recipes x terms) block per batch chunk
+
+    def __init__(self, recipes: Optional[Iterable[Recipe]] = None, tag_weight: float = 0.5):
+        """
+        Initialize the index, optionally with recipes.
+
+        Args:
+            recipes: Recipes to index.
+            tag_weight: Weight of a cuisine/dietary tag relative to an ingredient.
+        """
+        self.tag_weight = tag_weight
+        self._recipes: List[Recipe] = []
+        self._rows: Dict[str, int] = {}
+        self._terms: Dict[str, int] = {}
+        self._term_weights = array("f")  # Base weight per term (1.0 or tag_weight)
+        self._postings: List[array] = []  # Term -> rows containing it
+        self._doc_terms = array("i")  # Flattened term ids of every row
+        self._doc_owner = array("i")  # Row of each entry in _doc_terms
+        self._norms = array("f")
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._refreshed_size = 0
+        self._lock = threading.RLock()
+        if recipes:
+            self.add_many(recipes)
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def _recipe_terms(self, recipe: Recipe) -> Dict[str, float]:
+        terms = {f"ing:{canonical_ingredient_name(ing.name)}": 1.0 for ing in recipe.ingredients if ing.name}
+        for tag in recipe.cuisine_tags + recipe.dietary_tags:
+            terms[f"tag:{normalize_tag(tag)}"] = self.tag_weight
+        return terms
+
+    def _current_idf(self, term_id: int) -> float:
+        if term_id < len(self._idf) and self._refreshed_size:
+            return float(self._idf[term_id])
+        n = len(self._recipes)
+        return math.log((1 + n) / (1 + len(self._postings[term_id]))) + 1.0
+
+    def add(self, recipe: Recipe) -> None:
+        """
+        Index a recipe. Recipes whose ID is already indexed are skipped.
+
+        Args:
+            recipe: The recipe to index.
+        """
+        with self._lock:
+            if recipe.id in self._rows:
+                return
+            row = len(self._recipes)
+            self._rows[recipe.id] = row
+            self._recipes.append(recipe)
+
+            squared_norm = 0.0
+            for term, weight in self._recipe_terms(recipe).items():
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    term_id = self._terms[term] = len(self._postings)
+                    self._postings.append(array("i"))
+                    self._term_weights.append(weight)
+                self._postings[term_id].append(row)
+                self._doc_terms.append(term_id)
+                self._doc_owner.append(row)
+                squared_norm += (weight * self._current_idf(term_id)) ** 2
+            self._norms.append(math.sqrt(squared_norm))
+
+    def add_many(self, recipes: Iterable[Recipe]) -> None:
+        """Index several recipes."""
+        for recipe in recipes:
+            self.add(recipe)
+
+    def _refresh(self) -> None:
+        """Recompute IDF weights and all vector norms if the corpus has grown enough."""
+        n = len(self._recipes)
+        if self._refreshed_size and n - self._refreshed_size <= self.REFRESH_FRACTION * self._refreshed_size:
+            # Only give terms first seen since the last refresh an IDF weight
+            if len(self._idf) < len(self._postings):
+                new_terms = range(len(self._idf), len(self._postings))
+                self._idf = np.concatenate([
+                    self._idf, np.asarray([self._current_idf(t) for t in new_terms], dtype=np.float32)
+                ])
+            return
+        df = np.fromiter((len(p) for p in self._postings), dtype=np.float32, count=len(self._postings))
+        self._idf = (np.log((1 + n) / (1 + df)) + 1.0).astype(np.float32)
+        weights = np.frombuffer(self._term_weights, dtype=np.float32) * self._idf
+        doc_terms = np.frombuffer(self._doc_terms, dtype=np.int32)
+        owners = np.frombuffer(self._doc_owner, dtype=np.int32)
+        norms = np.sqrt(np.bincount(owners, weights=weights[doc_terms] ** 2, minlength=n))
+        self._norms = array("f", norms.astype(np.float32).tobytes())
+        self._refreshed_size = n
+
+    def similar(self, recipe: Union[Recipe, str], k: int = 5) -> SimilarResult:
+        """
+        Find the recipes most similar to one recipe.
+
+        Args:
+            recipe: A Recipe, or the ID of an indexed recipe.
+            k: Number of results.
+
+        Returns:
+            Up to k (recipe, cosine similarity) pairs, most similar first. The
+            query recipe itself is never returned.
+        """
+        return self.similar_batch([recipe], k)[0]
+
+    def similar_batch(self, recipes: List[Union[Recipe, str]], k: int = 5) -> List[SimilarResult]:
+        """
+        Find similar recipes for several queries with one matrix multiplication.
+
+        Args:
+            recipes: Recipes or IDs of indexed recipes.
+            k: Number of results per query.
+
+        Returns:
+            One result list per query, in query order.
+        """
+        with self._lock:
+            n = len(self._recipes)
+            if not n or not recipes:
+                return [[] for _ in recipes]
+            self._refresh()
+
+            queries = [self._recipes[self._rows[r]] if isinstance(r, str) and r in self._rows else r
+                       for r in recipes]
+            query_terms = []
+            for query in queries:
+                if isinstance(query, str):  # Unknown ID
+                    query_terms.append({})
+                    continue
+                query_terms.append({
+                    self._terms[term]: weight for term, weight in self._recipe_terms(query).items()
+                    if term in self._terms
+                })
+
+            # Group queries so each dense block stays within MAX_BLOCK_CELLS
+            max_terms = max(1, self.MAX_BLOCK_CELLS // n)
+            results: List[SimilarResult] = []
+            start = 0
+            while start < len(queries):
+                end, terms_in_chunk = start, set()
+                while end < len(queries) and (end == start or
+                                              len(terms_in_chunk | set(query_terms[end])) <= max_terms):
+                    terms_in_chunk |= set(query_terms[end])
+                    end += 1
+                results.extend(self._score_chunk(queries[start:end], query_terms[start:end], k))
+                start = end
+            return results
+
+    def _score_chunk(self, queries: List[Union[Recipe, str]],
+                     query_terms: List[Dict[int, float]], k: int) -> List[SimilarResult]:
+        """Score one group of queries against every indexed recipe."""
+        n = len(self._recipes)
+        used = sorted({term_id for terms in query_terms for term_id in terms})
+        if not used:
+            return [[] for _ in queries]
+        column = {term_id: j for j, term_id in enumerate(used)}
+        idf = self._idf[used]
+
+        # Dense block of the document vectors restricted to the used terms
+        block = np.zeros((n, len(used)), dtype=np.float32)
+        for j, term_id in enumerate(used):
+            rows = np.frombuffer(self._postings[term_id], dtype=np.int32)
+            block[rows, j] = self._term_weights[term_id] * idf[j]
+
+        query_matrix = np.zeros((len(used), len(queries)), dtype=np.float32)
+        for i, terms in enumerate(query_terms):
+            for term_id, weight in terms.items():
+                query_matrix[column[term_id], i] = weight * idf[column[term_id]]
+        query_norms = np.linalg.norm(query_matrix, axis=0)
+        query_norms[query_norms == 0] = 1.0
+
+        norms = np.frombuffer(self._norms, dtype=np.float32).copy()
+        norms[norms == 0] = 1.0
+        scores = (block @ query_matrix) / norms[:, None] / query_norms[None, :]
+
+        results = []
+        k = min(k, n)
+        for i, query in enumerate(queries):
+            column_scores = scores[:, i]
+            own_row = self._rows.get(query.id) if isinstance(query, Recipe) else None
+            if own_row is not None:
+                column_scores[own_row] = -1.0
+            top = np.argpartition(-column_scores, k - 1)[:k]
+            top = top[np.argsort(-column_scores[top], kind="stable")]
+            results.append([
+                (self._recipes[row], float(column_scores[row])) for row in top.tolist()
+                if column_scores[row] > 0
+            ])
+        return results
@@ -4,9 +4,11 @@
 import logging
 from typing import List, Optional, Dict, Any
 
+from .deadline import Deadline
 from .recipe_client_abc import RecipeClient, Recipe, RecipeIngredient
 from .spoonacular_client import SpoonacularClient
 from .spoonacular_models import SpoonacularRecipe
+from .tracing import span
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 class SpoonacularAdapter(RecipeClient):
     """Adapter for SpoonacularClient to conform to the RecipeClient interface."""
+    source_api = "spoonacular"
     
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -22,39 +25,50 @@ class SpoonacularAdapter(RecipeClient):
         """
         self.client = SpoonacularClient(api_key=api_key)
     
-    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Recipe]:
+    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None) -> List[Recipe]:
         """
         Search for recipes by query string.
         
         Args:
             query: The search query (recipe name, ingredients, etc.)
             filters: Optional filters like cuisine, diet, etc.
+            deadline: Optional deadline for the request.
             
         Returns:
             Standardized Recipe objects matching the query.
+            
+        Raises:
+            ProviderError: If the search failed.
         """
-        spoonacular_recipes = self.client.search_recipes(query, filters)
-        return [self._convert_spoonacular_to_recipe(recipe) for recipe in spoonacular_recipes]
+        spoonacular_recipes = self.client.search_recipes(query, filters, deadline=deadline, raise_errors=True)
+        with span("adapt", provider="spoonacular", count=len(spoonacular_recipes)):
+            return [self._convert_spoonacular_to_recipe(recipe) for recipe in spoonacular_recipes]
     
-    def get_recipe_by_id(self, recipe_id: str) -> Optional[Recipe]:
+    def get_recipe_by_id(self, recipe_id: str, deadline: Optional[Deadline] = None) -> Optional[Recipe]:
         """
         Get recipe details by ID.
         
         Args:
             recipe_id: The Spoonacular recipe ID, possibly with prefix.
+            deadline: Optional deadline for the request.
             
         Returns:
-            Standardized Recipe object if found, None otherwise.
+            Standardized Recipe object if found, None if Spoonacular has no such recipe.
+            
+        Raises:
+            ProviderError: If the lookup failed.
         """
         # Strip any prefix if this is a standardized ID
         if recipe_id.startswith("spoonacular_"):
             recipe_id = recipe_id[12:]  # Remove "spoonacular_" prefix
         
-        spoonacular_recipe = self.client.get_recipe_details_by_id(recipe_id)
+        spoonacular_recipe = self.client.get_recipe_details_by_id(recipe_id, deadline=deadline, raise_errors=True)
         if not spoonacular_recipe:
             return None
         
-        return self._convert_spoonacular_to_recipe(spoonacular_recipe)
+        with span("adapt", provider="spoonacular", count=1):
+            return self._convert_spoonacular_to_recipe(spoonacular_recipe)
     
     def _convert_spoonacular_to_recipe(self, sp_recipe: SpoonacularRecipe) -> Recipe:
         """Convert Spoonacular recipe to standardized Recipe model."""
@@ -2,28 +2,34 @@
 """Client for interacting with the Spoonacular API."""
 
 import os
+import re
 import requests
 import logging
 from typing import List, Optional, Dict, Any
 
+from .concurrency import limiter_for
+from .deadline import Deadline, DeadlineExceeded
+from .recipe_client_abc import ProviderError
 from .spoonacular_models import (
     SpoonacularSearchResponse,
     SpoonacularRecipe,
     SpoonacularIngredient,
     SpoonacularErrorResponse
 )
+from .tracing import SPAN_KIND_CLIENT, span
 
 # Configure logging
 logger = logging.getLogger(__name__)
-# Configure basic logging if no handlers are already configured
-if not logger.hasHandlers():
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Recipe IDs in endpoint paths ('recipes/716429/information'); the limiter tracks latency per endpoint
+_RECIPE_ID_RE = re.compile(r"/\d+/")
 
 
 class SpoonacularClient:
     """A client to fetch recipe data from the Spoonacular API."""
     BASE_URL = "https://api.spoonacular.com/"
     TIMEOUT = 15  # Default request timeout in seconds
+    MAX_CONCURRENCY = 8  # Upper bound for the adaptive limit on parallel requests
     
     def __init__(self, api_key: Optional[str] = None, timeout: int = TIMEOUT):
         """
@@ -44,15 +50,20 @@ class SpoonacularClient:
                 "Spoonacular API key not provided or found in environment variables (SPOONACULAR_API_KEY)."
             )
         self.timeout = timeout
+        self.limiter = limiter_for("spoonacular", max_limit=self.MAX_CONCURRENCY)
         logger.info(f"SpoonacularClient initialized with base URL: {self.BASE_URL}")
     
-    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                      deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Make a GET request to the Spoonacular API.
         
         Args:
             endpoint: The API endpoint to call (without the base URL).
             params: Optional query parameters.
+            deadline: Optional deadline; the request timeout is capped at the
+                      remaining time. Requests over the provider's adaptive
+                      concurrency limit wait for a slot (see concurrency.py).
             
         Returns:
             The JSON response as a dictionary.
@@ -60,6 +71,7 @@ class SpoonacularClient:
         Raises:
             requests.exceptions.RequestException: For network-related errors.
             ValueError: For JSON decoding errors.
+            DeadlineExceeded: If the deadline passed before the request was made.
         """
         if params is None:
             params = {}
@@ -69,7 +81,13 @@ class SpoonacularClient:
         
         url = f"{self.BASE_URL}{endpoint}"
         try:
-            response = requests.get(url, params=params, timeout=self.timeout)
+            with self.limiter.request(deadline, endpoint=_RECIPE_ID_RE.sub("/{id}/", endpoint)) as permit:
+                timeout = deadline.timeout(self.timeout) if deadline is not None else self.timeout
+                with span("network", SPAN_KIND_CLIENT, provider="spoonacular", endpoint=endpoint) as s:
+                    response = requests.get(url, params=params, timeout=timeout)
+                    s.set_attribute("http.status_code", response.status_code)
+                if response.status_code == 429 or response.status_code >= 500:
+                    permit.overloaded()
             
             # Handle Spoonacular-specific error codes
             if response.status_code == 401:
@@ -84,10 +102,13 @@ class SpoonacularClient:
                 
             response.raise_for_status()  # Raise exceptions for other bad status codes
             
-            return response.json()
+            with span("decode", provider="spoonacular", endpoint=endpoint, bytes=len(response.content)):
+                return response.json()
             
         except requests.exceptions.Timeout:
             logger.error(f"Request timed out for {url}")
+            if deadline is not None and deadline.expired:
+                deadline.mark_skipped(f"Spoonacular {endpoint} (timed out at deadline)")
             raise
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error occurred: {e.response.status_code} - {e.response.reason}")
@@ -106,13 +127,18 @@ class SpoonacularClient:
             logger.error(f"Error decoding JSON response from {url}")
             raise
     
-    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[SpoonacularRecipe]:
+    def search_recipes(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None,
+                       raise_errors: bool = False) -> List[SpoonacularRecipe]:
         """
         Search for recipes by name/ingredients.
         
         Args:
             query: The search query (can be recipe name, ingredients, etc.)
             filters: Optional filters like cuisine, diet, etc.
+            deadline: Optional deadline; the request gets only the remaining time.
+            raise_errors: Raise ProviderError if the search fails, instead of
+                          returning an empty list.
             
         Returns:
             List of SpoonacularRecipe objects matching the query.
@@ -133,39 +159,53 @@ class SpoonacularClient:
         logger.info(f"Searching Spoonacular for recipes matching: '{query}'")
         
         try:
-            raw_data = self._make_request(endpoint, params)
-            response = SpoonacularSearchResponse(**raw_data)
-            
-            # Process ingredients for each recipe
-            for recipe in response.results:
-                # Parse extended ingredients if available
-                if raw_data.get('results'):
-                    for result_data in raw_data['results']:
-                        if result_data.get('id') == recipe.id and result_data.get('extendedIngredients'):
-                            recipe.ingredients = [
-                                SpoonacularIngredient.from_spoonacular(ing) 
-                                for ing in result_data['extendedIngredients']
-                            ]
+            raw_data = self._make_request(endpoint, params, deadline)
+            with span("validate", provider="spoonacular", model="SpoonacularSearchResponse"):
+                response = SpoonacularSearchResponse(**raw_data)
+                
+                # Process ingredients for each recipe
+                for recipe in response.results:
+                    # Parse extended ingredients if available
+                    if raw_data.get('results'):
+                        for result_data in raw_data['results']:
+                            if result_data.get('id') == recipe.id and result_data.get('extendedIngredients'):
+                                recipe.ingredients = [
+                                    SpoonacularIngredient.from_spoonacular(ing) 
+                                    for ing in result_data['extendedIngredients']
+                                ]
             
             logger.info(f"Found {len(response.results)} recipe(s) matching '{query}'")
             return response.results
             
+        except DeadlineExceeded as e:
+            logger.warning(f"Deadline exceeded; skipping Spoonacular search for '{query}'")
+            deadline.mark_skipped(f"Spoonacular search '{query}'")
+            error = e
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error during search: {e}")
-            return []
+            error = e
         except ValueError as e:
             logger.error(f"Error processing search results: {e}")
-            return []
+            error = e
         except Exception as e:
             logger.error(f"Unexpected error during recipe search: {e}")
-            return []
+            error = e
+        if raise_errors:
+            raise ProviderError(f"Spoonacular search for '{query}' failed: {error}") from error
+        return []
     
-    def get_recipe_details_by_id(self, recipe_id: str) -> Optional[SpoonacularRecipe]:
+    def get_recipe_details_by_id(self, recipe_id: str,
+                                 deadline: Optional[Deadline] = None,
+                                 raise_errors: bool = False) -> Optional[SpoonacularRecipe]:
         """
         Get detailed information for a specific recipe by ID.
         
         Args:
             recipe_id: The Spoonacular recipe ID.
+            deadline: Optional deadline; the request gets only the remaining time.
+            raise_errors: Raise ProviderError if the lookup fails for any
+                          reason other than a 404, so None only means there
+                          is no such recipe.
             
         Returns:
             SpoonacularRecipe object if found, None otherwise.
@@ -178,43 +218,40 @@ class SpoonacularClient:
         logger.info(f"Fetching Spoonacular details for recipe ID: {recipe_id}")
         
         try:
-            recipe_data = self._make_request(endpoint, params)
-            
-            # Preprocess instructions if it's a string
-            if 'instructions' in recipe_data and isinstance(recipe_data['instructions'], str):
-                import re
-                instructions_text = recipe_data['instructions']
-                steps = re.split(r'\.(?:\s+|\n+)', instructions_text)
-                recipe_data['instructions'] = [step.strip() + "." for step in steps if step.strip()]
+            recipe_data = self._make_request(endpoint, params, deadline)
             
-            # Create the recipe object
-            recipe = SpoonacularRecipe(**recipe_data)
-            
-            # Extract ingredients
-            if recipe_data.get('extendedIngredients'):
-                recipe.ingredients = [
-                    SpoonacularIngredient.from_spoonacular(ing) 
-                    for ing in recipe_data['extendedIngredients']
-                ]
+            with span("validate", provider="spoonacular", model="SpoonacularRecipe"):
+                # Create the recipe object (its validator splits the instructions)
+                recipe = SpoonacularRecipe(**recipe_data)
                 
-            # Handle instructions parsing
-            if isinstance(recipe.instructions, str):
-                # Split into steps if it's a string
-                import re
-                steps = re.split(r'\.(?:\s+|\n+)', recipe.instructions)
-                recipe.instructions = [
-                    step.strip() + "." for step in steps if step.strip()
-                ]
+                # Extract ingredients
+                if recipe_data.get('extendedIngredients'):
+                    recipe.ingredients = [
+                        SpoonacularIngredient.from_spoonacular(ing) 
+                        for ing in recipe_data['extendedIngredients']
+                    ]
                 
             logger.info(f"Successfully retrieved details for recipe: {recipe.title}")
             return recipe
             
+        except DeadlineExceeded as e:
+            logger.warning(f"Deadline exceeded; skipping Spoonacular lookup for recipe {recipe_id}")
+            deadline.mark_skipped(f"Spoonacular lookup {recipe_id}")
+            error = e
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None  # No such recipe
+            logger.error(f"Request error fetching recipe {recipe_id}: {e}")
+            error = e
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error fetching recipe {recipe_id}: {e}")
-            return None
+            error = e
         except ValueError as e:
             logger.error(f"Error processing recipe {recipe_id}: {e}")
-            return None
+            error = e
         except Exception as e:
             logger.error(f"Unexpected error retrieving recipe {recipe_id}: {e}")
-            return None
+            error = e
+        if raise_errors:
+            raise ProviderError(f"Spoonacular lookup of recipe {recipe_id} failed: {error}") from error
+        return None
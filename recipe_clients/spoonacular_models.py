@@ -4,6 +4,8 @@
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, model_validator
 
+from .instructions import normalize_instructions
+
 
 class SpoonacularIngredient(BaseModel):
     """Represents a single ingredient with its measure from Spoonacular API."""
@@ -92,45 +94,15 @@ class SpoonacularRecipe(BaseModel):
         self.dietary_tags = list(set(tags))
         return self
     
-    @model_validator(mode='after')
-    def extract_instructions(self) -> 'SpoonacularRecipe':
-        """Extracts cooking instructions into a standardized list format."""
-        instructions = self.instructions
-        
-        # If instructions is already a list with content, use it
-        if isinstance(instructions, list) and instructions:
-            return self
-            
-        # If instructions is a string, try to split it into steps
-        if isinstance(instructions, str) and instructions:
-            # Split by periods followed by whitespace or newlines
-            import re
-            steps = re.split(r'\.(?:\s+|\n+)', instructions)
-            # Remove empty steps and clean up
-            steps = [step.strip() for step in steps if step.strip()]
-            if steps:
-                self.instructions = steps
-                return self
-        
-        # If we get here, instructions is either empty or not processed yet
-        
-        # Check for analyzedInstructions structure
-        analyzed = getattr(self, 'analyzedInstructions', [])
-        if analyzed and isinstance(analyzed, list):
-            steps = []
-            for section in analyzed:
-                for step in section.get("steps", []):
-                    text = step.get("step", "").strip()
-                    if text:
-                        steps.append(text)
-            if steps:
-                self.instructions = steps
-        
-        # Ensure we always have a list, even if empty
-        if not self.instructions:
-            self.instructions = []
-                
-        return self
+    @model_validator(mode='before')
+    @classmethod
+    def extract_instructions(cls, data: Any) -> Any:
+        """Normalizes instructions into a list of steps, preferring analyzedInstructions."""
+        if isinstance(data, dict):
+            data = dict(data)
+            data['instructions'] = normalize_instructions(data.get('instructions'),
+                                                          data.get('analyzedInstructions'))
+        return data
 
 
 class SpoonacularSearchResponse(BaseModel):
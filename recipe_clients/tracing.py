@@ -0,0 +1,359 @@
+# recipe_clients/tracing.py
+"""Lightweight per-request tracing of the recipe pipeline.
+
+A request is traced from `request_trace(request_id)` (entered by the chat
+layer, or by RecipeService when called directly) until it ends. Code on the
+request path opens a span per stage:
+
+    network   socket time of one HTTP call, including reading the body
+    decode    `response.json()`
+    validate  Pydantic validation of the decoded payload
+    adapt     conversion of provider models into Recipe objects
+    cache     reading and decoding shared cache entries
+    merge     combining and sorting the results of all providers
+
+The active trace and span live in context variables, so spans nest
+automatically and follow the request into threads started with
+`contextvars.copy_context()`. Finished traces are handed to the configured
+sink. When the request is not sampled, `span` returns a shared no-op object
+after a single context variable lookup.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "whiskai-recipe-clients"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+
+class Trace:
+    """The spans recorded for one request."""
+
+    def __init__(self, request_id: str, sampled: bool = True):
+        self.request_id = request_id
+        self.sampled = sampled
+        self.trace_id = uuid.uuid4().hex if sampled else ""
+        self.spans: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+class Span:
+    """One timed stage of a traced request. Use as a context manager."""
+
+    __slots__ = ("trace", "name", "kind", "span_id", "parent_id", "attributes",
+                 "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, trace: Trace, name: str, kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None and parent.trace is trace else None
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value pair, e.g. a result count, to the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.trace.add(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary form of the span."""
+        return {
+            "request_id": self.trace.request_id,
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": dict(self.attributes),
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned by `span` when the request is not traced."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class SpanSink(ABC):
+    """Destination for finished traces."""
+
+    @abstractmethod
+    def export(self, trace: Trace) -> None:
+        """Export the spans of a finished trace."""
+        pass
+
+
+class RingBufferSink(SpanSink):
+    """Keeps the spans of recent traces in memory, oldest dropped first."""
+
+    def __init__(self, capacity: int = 10_000):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of spans kept.
+        """
+        self._spans: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            self._spans.extend(trace.spans)
+
+    def spans(self, request_id: Optional[str] = None) -> List[Span]:
+        """
+        Get buffered spans, oldest first.
+
+        Args:
+            request_id: Only return spans of this request.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        if request_id is not None:
+            spans = [s for s in spans if s.trace.request_id == request_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class OTLPJsonFileSink(SpanSink):
+    """
+    Appends traces to a file in the OTLP/JSON trace format, one
+    ExportTraceServiceRequest per line, as read by the OpenTelemetry
+    Collector's file receiver.
+    """
+
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        """
+        Initialize the sink.
+
+        Args:
+            path: File to append to.
+            service_name: `service.name` resource attribute.
+        """
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(self.to_otlp(trace), separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def to_otlp(self, trace: Trace) -> Dict[str, Any]:
+        """Build the OTLP/JSON ExportTraceServiceRequest for a trace."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [self._otlp_span(trace, span) for span in trace.spans],
+            }],
+        }]}
+
+    @staticmethod
+    def _otlp_span(trace: Trace, span: Span) -> Dict[str, Any]:
+        attributes = dict(span.attributes, **{"whiskai.request_id": trace.request_id})
+        data = {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        return data
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("recipe_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("recipe_span", default=None)
+_NOOP_SPAN = _NoopSpan()
+_sink: Optional[SpanSink] = None
+_sample_rate = 0.0
+
+
+def configure_tracing(sink: Optional[SpanSink], sample_rate: float = 1.0) -> None:
+    """
+    Set where traces go and which fraction of requests is traced.
+
+    Tracing is off until this is called, unless WHISKAI_TRACE_FILE is set
+    (then traces go to an OTLPJsonFileSink at that path, sampled at
+    WHISKAI_TRACE_SAMPLE_RATE, default 1.0).
+
+    Args:
+        sink: The sink for finished traces; None turns tracing off.
+        sample_rate: Fraction of requests to trace, between 0 and 1.
+    """
+    global _sink, _sample_rate
+    _sink = sink
+    _sample_rate = sample_rate if sink is not None else 0.0
+
+
+def current_request_id() -> Optional[str]:
+    """The request ID of the active trace, sampled or not."""
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+class _RequestScope:
+    """Context manager entered by `request_trace` for the outermost traced call."""
+
+    __slots__ = ("trace", "sink", "_token")
+
+    def __init__(self, trace: Trace, sink: Optional[SpanSink]):
+        self.trace = trace
+        self.sink = sink
+
+    def __enter__(self) -> Optional[Trace]:
+        self._token = _current_trace.set(self.trace)
+        return self.trace if self.trace.sampled else None
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_trace.reset(self._token)
+        if self.trace.sampled:
+            try:
+                self.sink.export(self.trace)
+            except Exception as e:
+                logger.warning(f"Failed to export trace for request {self.trace.request_id}: {e}")
+        return False
+
+
+class _JoinedScope:
+    """Context manager returned when a trace is already active or tracing is off."""
+
+    __slots__ = ("trace",)
+
+    def __init__(self, trace: Optional[Trace]):
+        self.trace = trace
+
+    def __enter__(self) -> Optional[Trace]:
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NO_TRACE = _JoinedScope(None)
+
+
+def request_trace(request_id: Optional[str] = None, sampled: Optional[bool] = None):
+    """
+    Trace one request. Use as `with request_trace(request_id) as trace: ...`.
+
+    Nested calls join the active trace, so RecipeService methods called
+    inside the chat layer's trace do not start traces of their own.
+
+    Args:
+        request_id: ID propagated from the chat layer; a new one is
+                    generated if not provided.
+        sampled: Force the sampling decision; by default a request is
+                 traced with the configured sample rate.
+
+    Returns:
+        A context manager yielding the active Trace, or None if the request
+        is not traced.
+    """
+    active = _current_trace.get()
+    if active is not None:
+        return _JoinedScope(active) if active.sampled else _NO_TRACE
+    sink = _sink
+    if sampled is None:
+        sampled = _sample_rate > 0.0 and (_sample_rate >= 1.0 or random.random() < _sample_rate)
+    if sink is None or not sampled:
+        if request_id is None:
+            return _NO_TRACE  # Nothing to record and no ID to propagate
+        return _RequestScope(Trace(request_id, sampled=False), None)
+    return _RequestScope(Trace(request_id or uuid.uuid4().hex), sink)
+
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+    """
+    Open a span for a stage of the active request.
+
+    Use as `with span("validate", provider="spoonacular") as s: ...`.
+
+    Args:
+        name: Stage name (network, decode, validate, adapt, cache, merge, ...).
+        kind: OTLP span kind; SPAN_KIND_CLIENT for outgoing HTTP calls.
+        **attributes: Attributes recorded on the span.
+
+    Returns:
+        A Span, or a no-op stand-in when the request is not traced.
+    """
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        return _NOOP_SPAN
+    return Span(trace, name, kind, attributes)
+
+
+if os.environ.get("WHISKAI_TRACE_FILE"):
+    configure_tracing(OTLPJsonFileSink(os.environ["WHISKAI_TRACE_FILE"]),
+                      float(os.environ.get("WHISKAI_TRACE_SAMPLE_RATE", "1.0")))
@@ -0,0 +1,291 @@
+# recipe_clients/wire_format.py
+"""Compact wire format for sending Recipe lists to the React client.
+
+Recipes are encoded positionally rather than as keyed objects: each recipe
+is an array in WIRE_FIELDS order and each ingredient an array in
+INGREDIENT_FIELDS order, with trailing empty values dropped (but never the
+required leading fields). The envelope is
+
+    {"v": 1, "etag": "...", "recipes": [entry, ...]}
+
+where an entry is either the full array (its first element is the
+recipe's content hash) or just the content hash of a recipe the client
+said it already holds. The envelope is MessagePack when the client accepts
+it and the optional `msgpack` package is installed, JSON otherwise.
+
+Content hashes are stable across processes (BLAKE2b over the JSON of the
+positional array), so the same list of recipes always has the same ETag and
+a client that sends it back in If-None-Match gets a 304 with no body. A
+delta body (one with hash references) decodes to the same list only for a
+client holding the referenced recipes, so its ETag is the weak form of the
+full body's: If-None-Match still matches either, but a strong comparison
+(If-Match, If-Range) never takes one for the other. The
+packed form and hash of each Recipe object are memoized while the object
+lives, since the same store recipes are re-sent on many chat turns; like the
+rest of the package, this treats a Recipe as unchanged once created.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from .recipe_client_abc import Recipe, RecipeIngredient
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+WIRE_VERSION = 1
+WIRE_FIELDS = (
+    "id", "source_api", "source_id", "name", "ingredients", "instructions", "image_url",
+    "source_url", "prep_time_minutes", "cook_time_minutes", "total_time_minutes",
+    "servings", "cuisine_tags", "dietary_tags",
+)
+INGREDIENT_FIELDS = ("name", "amount", "unit", "original_text")
+# Leading fields without a default, which trimming must keep even when empty
+REQUIRED_WIRE_FIELDS = 4  # id, source_api, source_id, name
+REQUIRED_INGREDIENT_FIELDS = 1  # name
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/x-msgpack"
+_MSGPACK_TYPES = (MSGPACK_CONTENT_TYPE, "application/msgpack", "application/vnd.msgpack")
+_EMPTY = (None, "", [])
+
+# id(recipe) -> (weak reference, packed fields, content hash)
+_packed_cache: Dict[int, Tuple[weakref.ref, List[Any], str]] = {}
+_packed_cache_lock = threading.Lock()
+
+
+def _msgpack():
+    """Import msgpack lazily; None if it is not installed."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def _trim(values: List[Any], required: int) -> List[Any]:
+    end = len(values)
+    while end > required and values[end - 1] in _EMPTY:
+        end -= 1
+    return values[:end]
+
+
+def _pack_fields(recipe: Recipe) -> List[Any]:
+    """Positional array of a recipe's fields, without the hash."""
+    values = []
+    for name in WIRE_FIELDS:
+        value = getattr(recipe, name)
+        if name == "ingredients":
+            value = [_trim([getattr(ing, f) for f in INGREDIENT_FIELDS], REQUIRED_INGREDIENT_FIELDS)
+                     for ing in value]
+        values.append(value)
+    return _trim(values, REQUIRED_WIRE_FIELDS)
+
+
+def _hash_fields(fields: List[Any]) -> str:
+    canonical = json.dumps(fields, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _packed(recipe: Recipe) -> Tuple[List[Any], str]:
+    """Packed fields and content hash of a recipe, memoized per live object."""
+    key = id(recipe)
+    entry = _packed_cache.get(key)
+    if entry is not None and entry[0]() is recipe:
+        return entry[1], entry[2]
+    fields = _pack_fields(recipe)
+    content_hash = _hash_fields(fields)
+    with _packed_cache_lock:
+        _packed_cache[key] = (weakref.ref(recipe, lambda _, key=key: _packed_cache.pop(key, None)),
+                              fields, content_hash)
+    return fields, content_hash
+
+
+def recipe_hash(recipe: Recipe) -> str:
+    """
+    Stable content hash of a recipe.
+
+    Args:
+        recipe: The recipe.
+
+    Returns:
+        16 hex characters; equal for recipes with equal content.
+    """
+    return _packed(recipe)[1]
+
+
+def _unpack_recipe(values: Sequence[Any]) -> Recipe:
+    data = dict(zip(WIRE_FIELDS, values[1:]))
+    data["ingredients"] = [
+        RecipeIngredient(**dict(zip(INGREDIENT_FIELDS, ing))) for ing in data.get("ingredients") or []
+    ]
+    for name in ("instructions", "cuisine_tags", "dietary_tags"):
+        data[name] = list(data.get(name) or [])
+    return Recipe(**data)
+
+
+def choose_format(accept: Optional[str]) -> str:
+    """
+    Pick the wire format for a request's Accept header.
+
+    Args:
+        accept: The Accept header value, or None.
+
+    Returns:
+        'msgpack' if the client accepts it and msgpack is installed, else 'json'.
+    """
+    if accept and any(t in accept for t in _MSGPACK_TYPES) and _msgpack() is not None:
+        return "msgpack"
+    return "json"
+
+
+def list_etag(hashes: Iterable[str], fmt: str = "json", weak: bool = False) -> str:
+    """ETag for an ordered list of recipe hashes in one format; weak for delta bodies."""
+    digest = hashlib.blake2b(",".join(hashes).encode("ascii"), digest_size=8).hexdigest()
+    return f'W/"{digest}-{fmt}"' if weak else f'"{digest}-{fmt}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, RFC 9110).
+
+    Args:
+        if_none_match: The header value, or None.
+        etag: The current ETag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+@dataclass
+class WireResponse:
+    """An encoded recipe list ready to be sent over HTTP."""
+    status: int  # 200, or 304 when the client's copy is current
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    hashes: List[str] = field(default_factory=list)  # Content hash per recipe, in order
+
+
+def encode_recipes(recipes: Sequence[Recipe], fmt: str = "json",
+                   known_hashes: Optional[Iterable[str]] = None) -> bytes:
+    """
+    Encode a recipe list.
+
+    Args:
+        recipes: The recipes to send.
+        fmt: 'json' or 'msgpack'.
+        known_hashes: Content hashes of recipes the client already holds;
+                      those recipes are sent as a bare hash reference.
+
+    Returns:
+        The encoded envelope.
+    """
+    packed = [_packed(r) for r in recipes]
+    hashes = [p[1] for p in packed]
+    known = set(known_hashes or ())
+    return _encode_packed([p[0] for p in packed], hashes, fmt, known, _body_etag(hashes, fmt, known))
+
+
+def _body_etag(hashes: List[str], fmt: str, known: Set[str]) -> str:
+    return list_etag(hashes, fmt, weak=not known.isdisjoint(hashes))
+
+
+def _encode_packed(packed: List[List[Any]], hashes: List[str], fmt: str,
+                   known: Set[str], etag: str) -> bytes:
+    envelope = {
+        "v": WIRE_VERSION,
+        "etag": etag,
+        "recipes": [h if h in known else [h] + fields for fields, h in zip(packed, hashes)],
+    }
+    if fmt == "msgpack":
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise ImportError("msgpack is required for the msgpack wire format. Install it with `pip install msgpack`.")
+        return msgpack.packb(envelope, use_bin_type=True)
+    return json.dumps(envelope, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_recipes(body: bytes, content_type: str = JSON_CONTENT_TYPE,
+                   known: Optional[Mapping[str, Recipe]] = None) -> List[Recipe]:
+    """
+    Decode an envelope produced by `encode_recipes`.
+
+    Args:
+        body: The encoded envelope.
+        content_type: Its Content-Type.
+        known: Recipes the receiver holds, keyed by content hash, used to
+               resolve hash references.
+
+    Returns:
+        The recipes in order.
+
+    Raises:
+        ValueError: For an unsupported version or an unresolvable reference.
+    """
+    if any(t in content_type for t in _MSGPACK_TYPES):
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise ImportError("msgpack is required to decode the msgpack wire format.")
+        envelope = msgpack.unpackb(body, raw=False)
+    else:
+        envelope = json.loads(body)
+    if envelope.get("v") != WIRE_VERSION:
+        raise ValueError(f"Unsupported recipe wire format version: {envelope.get('v')}")
+    recipes = []
+    for entry in envelope["recipes"]:
+        if isinstance(entry, str):
+            if known is None or entry not in known:
+                raise ValueError(f"Unknown recipe reference: {entry}")
+            recipes.append(known[entry])
+        else:
+            recipes.append(_unpack_recipe(entry))
+    return recipes
+
+
+def build_response(recipes: Sequence[Recipe], accept: Optional[str] = None,
+                   if_none_match: Optional[str] = None,
+                   known_hashes: Union[str, Iterable[str], None] = None) -> WireResponse:
+    """
+    Build a conditional response for a recipe list.
+
+    Args:
+        recipes: The recipes to send.
+        accept: The request's Accept header.
+        if_none_match: The request's If-None-Match header.
+        known_hashes: Content hashes the client already holds, as an iterable
+                      or a comma-separated header value (e.g. X-Known-Recipes).
+
+    Returns:
+        A 304 with an empty body if the client's ETag is current, otherwise
+        a 200 carrying the (delta) envelope. Both carry ETag and Vary
+        headers; the ETag is weak when the body has hash references.
+    """
+    fmt = choose_format(accept)
+    packed = [_packed(r) for r in recipes]
+    hashes = [p[1] for p in packed]
+    if isinstance(known_hashes, str):
+        known_hashes = [h.strip() for h in known_hashes.split(",") if h.strip()]
+    known = set(known_hashes or ())
+    etag = _body_etag(hashes, fmt, known)
+    headers = {"ETag": etag, "Vary": "Accept, X-Known-Recipes"}
+    if etag_matches(if_none_match, etag):
+        return WireResponse(304, b"", headers, hashes)
+
+    body = _encode_packed([p[0] for p in packed], hashes, fmt, known, etag)
+    headers["Content-Type"] = MSGPACK_CONTENT_TYPE if fmt == "msgpack" else JSON_CONTENT_TYPE
+    return WireResponse(200, body, headers, hashes)